@@ -0,0 +1,255 @@
+"""
+Booklet Schema Module
+Structured-output schema, validation and local text rendering for follow-up booklets
+"""
+
+import json
+import textwrap
+from typing import Dict, List, Optional
+
+from prompts import BOOKLET_PROMPT_TEMPLATE
+
+MAX_REPAIR_ATTEMPTS = 2
+
+_STRING = {"type": "STRING"}
+
+
+def _object(properties: Dict[str, Dict]) -> Dict:
+    return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+
+
+def _array(items: Dict) -> Dict:
+    return {"type": "ARRAY", "items": items}
+
+
+# Section name -> schema. Order matches the OUTPUT FORMAT template.
+SECTION_SCHEMAS = {
+    "company_name": _STRING,
+    "why_this_matters_now": _STRING,
+    "five_minute_win": _STRING,
+    "situation": _object({
+        "company": _STRING,
+        "industry": _STRING,
+        "current_revenue": _STRING,
+        "team_size": _STRING,
+        "time_in_business": _STRING,
+        "primary_challenge": _STRING,
+        "quote": _STRING,
+    }),
+    "observations": _array(_STRING),
+    "insights": _array(_object({"title": _STRING, "explanation": _STRING})),
+    "resources": _array(_STRING),
+    "actions": _array(_object({"action": _STRING, "why": _STRING, "how": _STRING, "deadline": _STRING})),
+    "one_thing": _STRING,
+    "success_metrics": _object({"week_1": _STRING, "week_2": _STRING, "days_30": _STRING}),
+    "connections": _array(_object({
+        "name": _STRING,
+        "company": _STRING,
+        "why_connect": _STRING,
+        "suggested_approach": _STRING,
+    })),
+    "prepared_for": _STRING,
+}
+
+# Exact item counts the template asks for; other lists need at least one item
+_LIST_LENGTHS = {"observations": 3, "insights": 3, "actions": 3}
+# Lists that may legitimately be empty (nothing is invented to fill them)
+_OPTIONAL_LISTS = {"resources"}
+
+
+def structured_config(schema: Dict) -> Dict:
+    """
+    generate_content config requesting JSON output matching a schema
+    """
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def response_schema(sections: Optional[List[str]] = None) -> Dict:
+    """
+    Structured-output schema for all sections, or only the given ones
+    """
+    names = sections or list(SECTION_SCHEMAS)
+    return _object({name: SECTION_SCHEMAS[name] for name in names})
+
+
+def _template_block(start: str, end: str) -> str:
+    """
+    Verbatim static text from the OUTPUT FORMAT template, between two markers
+    """
+    begin = BOOKLET_PROMPT_TEMPLATE.index(start)
+    finish = BOOKLET_PROMPT_TEMPLATE.index(end, begin)
+    block = BOOKLET_PROMPT_TEMPLATE[begin:finish]
+    return textwrap.dedent(" " * 12 + block).strip()
+
+
+_INTRO = _template_block("On [IT_Date]", "\n\n            Why This Matters Now:")
+_STATIC_CLOSING = _template_block("What Others Are Saying", "\n\n            Document prepared for:")
+
+
+def _is_filled(value, schema: Dict) -> bool:
+    if schema["type"] == "STRING":
+        return isinstance(value, str) and bool(value.strip())
+    if schema["type"] == "ARRAY":
+        return isinstance(value, list) and all(_is_filled(item, schema["items"]) for item in value)
+    if schema["type"] == "OBJECT":
+        return isinstance(value, dict) and all(
+            _is_filled(value.get(key), sub_schema) for key, sub_schema in schema["properties"].items()
+        )
+    return False
+
+
+def validate_sections(data: Dict) -> List[str]:
+    """
+    Names of sections that are missing, empty or malformed
+    """
+    failed = []
+    for name, schema in SECTION_SCHEMAS.items():
+        value = data.get(name) if isinstance(data, dict) else None
+        if not _is_filled(value, schema):
+            failed.append(name)
+        elif name in _LIST_LENGTHS and len(value) != _LIST_LENGTHS[name]:
+            failed.append(name)
+        elif schema["type"] == "ARRAY" and not value and name not in _OPTIONAL_LISTS:
+            failed.append(name)
+    return failed
+
+
+def _strip_long_dashes(value):
+    """
+    Enforce the "no long dashes" rule locally instead of re-requesting a section
+    """
+    if isinstance(value, str):
+        return value.replace(" — ", " - ").replace("—", " - ")
+    if isinstance(value, list):
+        return [_strip_long_dashes(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _strip_long_dashes(item) for key, item in value.items()}
+    return value
+
+
+def parse_sections(response) -> Dict:
+    """
+    Section dict from a structured-output response or its JSON text (empty dict if unparseable)
+    """
+    data = getattr(response, "parsed", None)
+    if not isinstance(data, dict):
+        try:
+            data = json.loads(response if isinstance(response, str) else response.text)
+        except (TypeError, ValueError, AttributeError):
+            return {}
+    return _strip_long_dashes(data) if isinstance(data, dict) else {}
+
+
+def build_repair_prompt(base_prompt: str, data: Dict, failed: List[str]) -> str:
+    """
+    Prompt asking only for the sections that failed validation
+    """
+    kept = {name: value for name, value in data.items() if name not in failed}
+    return (
+        f"{base_prompt}\n\n"
+        "The following sections of this follow-up document were already written and are correct:\n"
+        f"{json.dumps(kept, indent=2, ensure_ascii=False)}\n\n"
+        f"Rewrite ONLY these sections, consistent with the ones above: {', '.join(failed)}.\n"
+        "Observations, insights and actions must have exactly 3 items each."
+    )
+
+
+def render_booklet(data: Dict, context: Dict[str, str]) -> str:
+    """
+    Render validated sections into the plain-text booklet layout of the template
+
+    Args:
+        data: Section dict matching SECTION_SCHEMAS
+        context: "month_year", "it_date" and "number_of_people" values
+    """
+    situation = data["situation"]
+    metrics = data["success_metrics"]
+    intro = _INTRO.replace("[IT_Date]", context["it_date"]).replace(
+        "[Number_of_people]", context["number_of_people"]
+    )
+
+    lines = [
+        f"{context['month_year']} | Confidential Strategic Document",
+        f"{data['company_name']} - Innovators Table Strategic Brief",
+        "",
+        "What Happened at Your Table",
+        intro,
+        "",
+        "Why This Matters Now:",
+        data["why_this_matters_now"],
+        "",
+        "YOUR 5-MINUTE WIN (Do This Right Now):",
+        data["five_minute_win"],
+        "",
+        "Why this matters: Momentum starts with the first step, no matter how small.",
+        "",
+        "Your Situation: What We Heard",
+        f"Company: {situation['company']}",
+        f"Industry: {situation['industry']}",
+        f"Current Revenue: {situation['current_revenue']}",
+        f"Team Size: {situation['team_size']}",
+        f"Time in Business: {situation['time_in_business']}",
+        "Your Primary Challenge:",
+        situation["primary_challenge"],
+        "Quote from You:",
+        "\"" + situation["quote"].strip('"') + "\"",
+        "",
+        "What We Observed:",
+        *data["observations"],
+        "",
+        "Key Insights from the Table",
+        "These are the most valuable insights specifically for your situation:",
+    ]
+    for number, insight in enumerate(data["insights"], 1):
+        lines += [f"Insight #{number}: {insight['title']}", insight["explanation"]]
+
+    lines += ["", "Resources Mentioned:", *data["resources"], ""]
+
+    lines += [
+        "Your 7-Day Action Plan",
+        "These three actions will create the most momentum for your business this week:",
+    ]
+    for number, action in enumerate(data["actions"], 1):
+        lines += [
+            f"Action #{number}: {action['action']}",
+            f"Why: {action['why']}",
+            f"How: {action['how']}",
+            f"Deadline: {action['deadline']}",
+        ]
+
+    lines += ["", "Success Tracker (Check Off as You Complete):"]
+    for number, action in enumerate(data["actions"], 1):
+        lines.append(f"☐ Action #{number} completed by {action['deadline']}")
+    for connection in data["connections"][:2]:
+        lines.append(f"☐ Connected with {connection['name']}")
+    lines.append("☐ Progress email sent to request full Strategic Mirror Document")
+
+    lines += [
+        "",
+        "IF YOU ONLY DO ONE THING THIS WEEK:",
+        data["one_thing"],
+        "Do this, and everything else becomes easier.",
+        "",
+        "Success Metrics (How to Know You're Winning):",
+        f"Week 1: {metrics['week_1']}",
+        f"Week 2: {metrics['week_2']}",
+        f"30 Days: {metrics['days_30']}",
+        "",
+        "Connections to Make",
+        "People from the table who can help you:",
+    ]
+    for connection in data["connections"]:
+        lines += [
+            f"{connection['name']} - {connection['company']}",
+            f"Why connect: {connection['why_connect']}",
+            f"Suggested approach: {connection['suggested_approach']}",
+        ]
+
+    lines += [
+        "",
+        _STATIC_CLOSING,
+        "",
+        f"Document prepared for: {data['prepared_for']}",
+        f"Innovators Table | {context['month_year']}",
+    ]
+    return "\n".join(lines)
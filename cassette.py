@@ -0,0 +1,172 @@
+"""
+Cassette Module
+Records outbound Gemini, GHL and Google calls to a file and replays them offline
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded"""
+
+
+def request_key(service: str, request: Dict) -> str:
+    """
+    Stable key identifying a request within a cassette
+    """
+    payload = json.dumps([service, request], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    JSONL file of recorded calls.
+
+    In record mode every call is executed and appended with its response (or
+    error) and latency. In replay mode calls are answered from the file in
+    recorded order per request, optionally sleeping for the recorded latency.
+    """
+
+    def __init__(self, path: str, mode: str, replay_latency: bool = True):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.meta = {}
+        self._entries = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        if mode == MODE_REPLAY:
+            self._load()
+        else:
+            open(path, "w", encoding="utf-8").close()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "meta" in entry:
+                    self.meta[entry["name"]] = entry["meta"]
+                else:
+                    self._entries[entry["key"]].append(entry)
+
+    def _append(self, entry: Dict):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def record_meta(self, name: str, meta: Dict):
+        """
+        Store run inputs (emails, transcript, event date...) needed to re-run offline
+        """
+        if self.mode == MODE_RECORD:
+            self._append({"name": name, "meta": meta})
+
+    def call(
+        self,
+        service: str,
+        request: Dict,
+        fn: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda response: response,
+        decode: Callable[[Any], Any] = lambda payload: payload,
+        error_type: Callable[[str], Exception] = RuntimeError
+    ) -> Any:
+        """
+        Execute and record `fn`, or replay its recorded result
+
+        Args:
+            service: "gemini", "ghl" or "google"
+            request: JSON-serializable description of the request, used as the match key
+            fn: Performs the real call (only used in record mode)
+            encode/decode: Convert the response to and from its JSON form
+            error_type: Exception raised when replaying a recorded failure
+        """
+        key = request_key(service, request)
+
+        if self.mode == MODE_REPLAY:
+            with self._lock:
+                recorded = self._entries.get(key)
+                if not recorded:
+                    raise CassetteMiss(f"No recorded {service} response for request {key[:12]}")
+                entry = recorded.popleft()
+            if self.replay_latency:
+                time.sleep(entry["latency"])
+            if "error" in entry:
+                raise error_type(entry["error"])
+            return decode(entry["response"])
+
+        started = time.perf_counter()
+        entry = {"service": service, "key": key, "summary": json.dumps(request, default=str)[:300]}
+        try:
+            response = fn()
+        except Exception as e:
+            entry.update(error=str(e), latency=time.perf_counter() - started)
+            self._append(entry)
+            raise
+        entry.update(response=encode(response), latency=time.perf_counter() - started)
+        self._append(entry)
+        return response
+
+
+_active: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    The active cassette, if recording or replaying
+    """
+    return _active
+
+
+def activate(cassette: Optional[Cassette]):
+    global _active
+    _active = cassette
+
+
+@contextmanager
+def use_cassette(path: str, mode: str, replay_latency: bool = True):
+    """
+    Record or replay every external call made inside the block
+    """
+    previous = _active
+    activate(Cassette(path, mode, replay_latency))
+    try:
+        yield _active
+    finally:
+        activate(previous)
+
+
+def cassette_call(service: str, request: Dict, fn: Callable[[], Any], **kwargs) -> Any:
+    """
+    Route a call through the active cassette, or just run it when none is active
+    """
+    if _active is None:
+        return fn()
+    return _active.call(service, request, fn, **kwargs)
+
+
+def record_meta(name: str, meta: Dict):
+    if _active is not None:
+        _active.record_meta(name, meta)
+
+
+# CASSETTE_MODE=record|replay and CASSETTE_PATH=... apply to the whole app process
+if os.getenv("CASSETTE_MODE") in (MODE_RECORD, MODE_REPLAY):
+    activate(Cassette(
+        os.getenv("CASSETTE_PATH", "cassette.jsonl"),
+        os.getenv("CASSETTE_MODE"),
+        os.getenv("CASSETTE_REPLAY_LATENCY", "1") != "0",
+    ))
@@ -0,0 +1,623 @@
+"""
+Deferred Batch Module
+Runs extraction and booklet generation for one or more events as bulk batch jobs
+polled in the background, instead of interactive per-speaker Gemini calls
+"""
+
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+import shutil
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from booklet_schema import (
+    MAX_REPAIR_ATTEMPTS, build_repair_prompt, parse_sections, response_schema,
+    structured_config, validate_sections,
+)
+from generation import MODEL, generate_content, get_client, render_sections, response_text
+from prompts import build_extraction_prompt, build_structured_booklet_prompt
+from quota_scheduler import PRIORITY_BATCH
+from regeneration import ACTION_BOOKLET, ACTION_REUSE, new_cache, plan_regeneration
+from result_store import make_record
+
+RUNS_DIR = os.getenv("DEFERRED_RUNS_DIR", "deferred_runs")
+POLL_INTERVAL_SECONDS = float(os.getenv("DEFERRED_POLL_SECONDS", "60"))
+
+# Same threshold as the interactive run
+MIN_EXTRACTION_LENGTH = 20
+
+JOB_PENDING = "pending"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+STAGE_EXTRACT = "extract"
+STAGE_BOOKLET = "booklet"
+STAGE_REPAIR = "repair"
+STAGE_DONE = "done"
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+BACKEND_GEMINI = "gemini"
+BACKEND_LOCAL = "local"
+
+# Polling stops after this many consecutive auth errors. Jobs belong to the
+# key's project, so another key is refused (401/403) or can't see them (404).
+MAX_AUTH_FAILURES = 3
+_AUTH_ERROR_CODES = (401, 403, 404)
+
+
+def batch_request(key: str, contents: str, config: Optional[Dict] = None) -> Dict:
+    """
+    One line of a batch job file, in the Gemini batch JSONL layout
+    """
+    request = {"contents": [{"role": "user", "parts": [{"text": contents}]}]}
+    if config:
+        request["generation_config"] = config
+    return {"key": key, "request": request}
+
+
+def parse_result_lines(content: str) -> Dict[str, Dict]:
+    """
+    Map each request key of a batch output file to {"text": ...} or {"error": ...}
+    """
+    results = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response")
+        if response is None:
+            error = entry.get("error") or entry.get("status") or "No response"
+            results[entry["key"]] = {"error": json.dumps(error, default=str)}
+            continue
+        candidates = response.get("candidates") or []
+        parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+        text = "".join(part.get("text", "") for part in parts if not part.get("thought"))
+        results[entry["key"]] = {"text": text} if text else {"error": "Empty response"}
+    return results
+
+
+class BatchBackend(ABC):
+    """
+    Submits a JSONL file of requests as one job and reports on it
+    """
+
+    @abstractmethod
+    def submit(self, path: str, display_name: str) -> str:
+        """Submit the job file and return the job id"""
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        """JOB_PENDING, JOB_SUCCEEDED or JOB_FAILED"""
+
+    @abstractmethod
+    def results(self, job_id: str) -> Dict[str, Dict]:
+        """Results of a finished job, as returned by parse_result_lines()"""
+
+
+# Terminal Gemini batch states; anything else is still queued or running
+_GEMINI_STATES = {
+    "JOB_STATE_SUCCEEDED": JOB_SUCCEEDED,
+    "JOB_STATE_FAILED": JOB_FAILED,
+    "JOB_STATE_CANCELLED": JOB_FAILED,
+    "JOB_STATE_EXPIRED": JOB_FAILED,
+}
+
+
+class GeminiBatchBackend(BatchBackend):
+    """
+    Gemini batch mode: the job file is uploaded and processed asynchronously at batch pricing
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, path: str, display_name: str) -> str:
+        uploaded = self.client.files.upload(
+            file=path, config={"display_name": display_name, "mime_type": "jsonl"}
+        )
+        job = self.client.batches.create(model=MODEL, src=uploaded.name, config={"display_name": display_name})
+        return job.name
+
+    def status(self, job_id: str) -> str:
+        state = self.client.batches.get(name=job_id).state
+        return _GEMINI_STATES.get(getattr(state, "name", str(state)), JOB_PENDING)
+
+    def results(self, job_id: str) -> Dict[str, Dict]:
+        job = self.client.batches.get(name=job_id)
+        return parse_result_lines(self.client.files.download(file=job.dest.file_name).decode("utf-8"))
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    File-based stand-in for the batch service
+
+    Submitted job files are copied into `directory`. Once `delay_seconds` have
+    passed, the next status check answers every request with `responder` and
+    writes the output file next to the input.
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[Dict], str],
+        directory: str = os.path.join(RUNS_DIR, "local_jobs"),
+        delay_seconds: float = 0.0
+    ):
+        self.responder = responder
+        self.directory = directory
+        self.delay_seconds = delay_seconds
+
+    def _path(self, job_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{kind}.jsonl")
+
+    def submit(self, path: str, display_name: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        shutil.copyfile(path, self._path(job_id, "input"))
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        if os.path.exists(self._path(job_id, "output")):
+            return JOB_SUCCEEDED
+        input_path = self._path(job_id, "input")
+        if not os.path.exists(input_path):
+            return JOB_FAILED
+        if time.time() - os.path.getmtime(input_path) < self.delay_seconds:
+            return JOB_PENDING
+        self._process(job_id)
+        return JOB_SUCCEEDED
+
+    def _process(self, job_id: str):
+        lines = []
+        with open(self._path(job_id, "input"), encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                try:
+                    text = self.responder(entry["request"])
+                    response = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+                    lines.append({"key": entry["key"], "response": response})
+                except Exception as e:
+                    lines.append({"key": entry["key"], "error": {"message": str(e)}})
+
+        output_path = self._path(job_id, "output")
+        with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        os.replace(output_path + ".tmp", output_path)
+
+    def results(self, job_id: str) -> Dict[str, Dict]:
+        with open(self._path(job_id, "output"), encoding="utf-8") as f:
+            return parse_result_lines(f.read())
+
+
+def synchronous_responder(client, session_id: str = "deferred") -> Callable[[Dict], str]:
+    """
+    Responder for LocalFileBatchBackend that answers through the regular, quota-paced Gemini calls
+    """
+    def respond(request: Dict) -> str:
+        contents = request["contents"][0]["parts"][0]["text"]
+        response = generate_content(
+            client, contents, session_id, priority=PRIORITY_BATCH, config=request.get("generation_config")
+        )
+        return response_text(response)
+    return respond
+
+
+def key_fingerprint(api_key: str) -> str:
+    """
+    Short, non-reversible id of an API key, stored with a run so it is only polled with that key
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def get_backend(api_key: str, name: str = BACKEND_GEMINI) -> BatchBackend:
+    """
+    Backend used to run a deferred run's jobs
+    """
+    if name == BACKEND_LOCAL:
+        return LocalFileBatchBackend(synchronous_responder(get_client(api_key)))
+    return GeminiBatchBackend(get_client(api_key))
+
+
+_index_lock = threading.Lock()
+
+
+def _run_path(run_id: str) -> str:
+    return os.path.join(RUNS_DIR, f"{run_id}.json")
+
+
+def _index_path() -> str:
+    return os.path.join(RUNS_DIR, "index.json")
+
+
+def _write_json(path: str, data):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def _index_entry(run: Dict) -> Dict:
+    """
+    Light view of a run for listing, without its transcripts, prompts or booklets
+    """
+    return {
+        "run_id": run["run_id"],
+        "created": run["created"],
+        "backend": run["backend"],
+        "key_id": run.get("key_id"),
+        "status": run["status"],
+        "stage": run["stage"],
+        "message": run["message"],
+        "summary": run_summary(run),
+        "events": {event_id: event["it_date"] for event_id, event in run["events"].items()},
+        "errors": run_errors(run),
+    }
+
+
+def save_run(run: Dict):
+    """
+    Persist a run manifest atomically, so it survives reruns and restarts,
+    and update its entry in the run index
+    """
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    _write_json(_run_path(run["run_id"]), run)
+    with _index_lock:
+        index = _load_index()
+        index[run["run_id"]] = _index_entry(run)
+        _write_json(_index_path(), index)
+
+
+def load_run(run_id: str) -> Dict:
+    with open(_run_path(run_id), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_index() -> Dict[str, Dict]:
+    if not os.path.exists(_index_path()):
+        return {}
+    with open(_index_path(), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_runs() -> List[Dict]:
+    """
+    Index entries of every saved run, newest first (full manifests are only read by load_run)
+    """
+    with _index_lock:
+        index = _load_index()
+    return sorted(index.values(), key=lambda entry: entry["created"], reverse=True)
+
+
+def create_run(
+    events: List[Dict],
+    cache: Optional[Dict] = None,
+    backend: str = BACKEND_GEMINI,
+    key_id: str = ""
+) -> Dict:
+    """
+    Plan a deferred run over one or more events and save its manifest
+
+    Args:
+        events: Dicts with "it_date", "transcripts", "transcript_hash" and "roster"
+            (speaker details from build_roster)
+        cache: Previous generations; reusable extractions and booklets are not resubmitted
+        backend: Name of the backend the run's jobs are submitted to
+        key_id: key_fingerprint() of the API key the jobs are submitted with
+
+    Returns:
+        The run manifest. Items are keyed "event|speaker" and batch requests
+        "event|speaker|stage", so results fan back out to their speaker.
+    """
+    cache = cache or new_cache()
+    run = {
+        "run_id": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}",
+        "created": time.time(),
+        "backend": backend,
+        "key_id": key_id,
+        "status": STATUS_RUNNING,
+        "stage": STAGE_EXTRACT,
+        "repairs": 0,
+        "message": "",
+        "jobs": [],
+        "events": {},
+        "items": {},
+    }
+
+    for index, event in enumerate(events):
+        event_id = f"{index + 1}-{event['it_date']}".replace("|", "_")
+        run["events"][event_id] = {
+            "it_date": event["it_date"],
+            "transcripts": event["transcripts"],
+            "roster": event["roster"],
+        }
+        for entry in plan_regeneration(event["roster"], event["transcript_hash"], event["it_date"], cache):
+            item = {
+                "event": event_id,
+                "speaker": entry["speaker"],
+                "extraction_key": entry["extraction_key"],
+                "booklet_key": entry["booklet_key"],
+                "extraction": None,
+                "sections": None,
+                "failed": [],
+                "error": None,
+                "record": None,
+            }
+            if entry["action"] == ACTION_REUSE:
+                item["record"] = cache["booklets"][entry["booklet_key"]]
+            elif entry["action"] == ACTION_BOOKLET:
+                item["extraction"] = cache["extractions"][entry["extraction_key"]]
+            run["items"][f"{event_id}|{entry['speaker']}"] = item
+
+    save_run(run)
+    return run
+
+
+def _booklet_prompt(run: Dict, item: Dict) -> str:
+    event = run["events"][item["event"]]
+    return build_structured_booklet_prompt(item["speaker"], event["roster"], item["extraction"], event["it_date"])
+
+
+def _stage_requests(run: Dict, stage: str) -> List[Dict]:
+    requests = []
+    for key, item in run["items"].items():
+        if item["error"] or item["record"]:
+            continue
+        request_key = f"{key}|{stage}"
+        if stage == STAGE_EXTRACT and item["extraction"] is None:
+            event = run["events"][item["event"]]
+            prompt = build_extraction_prompt(event["roster"][item["speaker"]], event["transcripts"])
+            requests.append(batch_request(request_key, prompt))
+        elif stage == STAGE_BOOKLET and item["extraction"] is not None and item["sections"] is None:
+            requests.append(batch_request(
+                request_key, _booklet_prompt(run, item), structured_config(response_schema())
+            ))
+        elif stage == STAGE_REPAIR and item["failed"]:
+            requests.append(batch_request(
+                request_key,
+                build_repair_prompt(_booklet_prompt(run, item), item["sections"], item["failed"]),
+                structured_config(response_schema(item["failed"])),
+            ))
+    return requests
+
+
+def _apply_results(run: Dict, stage: str, results: Dict[str, Dict]):
+    for request_key, result in results.items():
+        item = run["items"].get(request_key.rsplit("|", 1)[0])
+        if item is None:
+            continue
+        if "error" in result:
+            item["error"] = f"{stage} request failed: {result['error']}"
+        elif stage == STAGE_EXTRACT:
+            if len(result["text"]) < MIN_EXTRACTION_LENGTH:
+                item["error"] = "Speaker transcripts looks empty or too short."
+            else:
+                item["extraction"] = result["text"]
+        elif stage == STAGE_BOOKLET:
+            item["sections"] = parse_sections(result["text"])
+            item["failed"] = validate_sections(item["sections"])
+        else:
+            repaired = parse_sections(result["text"])
+            item["sections"].update({name: repaired[name] for name in item["failed"] if name in repaired})
+            item["failed"] = validate_sections(item["sections"])
+
+    # Requests the job silently dropped
+    for item in run["items"].values():
+        if item["error"] or item["record"]:
+            continue
+        if (stage == STAGE_EXTRACT and item["extraction"] is None) or \
+                (stage == STAGE_BOOKLET and item["sections"] is None):
+            item["error"] = f"No {stage} result returned"
+
+
+def _next_stage(run: Dict):
+    stage = run["stage"]
+    if stage == STAGE_REPAIR:
+        run["repairs"] += 1
+    if stage == STAGE_EXTRACT:
+        run["stage"] = STAGE_BOOKLET
+    elif run["repairs"] < MAX_REPAIR_ATTEMPTS and any(
+        item["failed"] and not item["error"] for item in run["items"].values()
+    ):
+        run["stage"] = STAGE_REPAIR
+    else:
+        run["stage"] = STAGE_DONE
+
+
+def _finish(run: Dict):
+    for item in run["items"].values():
+        if item["error"] or item["record"]:
+            continue
+        if item["failed"]:
+            item["error"] = f"Booklet is missing sections: {', '.join(item['failed'])}"
+            continue
+        event = run["events"][item["event"]]
+        roster = event["roster"]
+        booklet = render_sections(item["sections"], roster, event["it_date"])
+        item["record"] = make_record(item["speaker"], roster[item["speaker"]], booklet, 0.0, 0.0)
+
+    summary = run_summary(run)
+    run["status"] = STATUS_DONE
+    run["message"] = f"{summary['completed']} booklets ready, {summary['errors']} failed"
+
+
+def current_job(run: Dict) -> Optional[Dict]:
+    """
+    The submitted job that has not been collected yet, if any
+    """
+    if run["jobs"] and run["jobs"][-1]["finished"] is None:
+        return run["jobs"][-1]
+    return None
+
+
+def advance(run: Dict, backend: BatchBackend) -> Dict:
+    """
+    Move a run forward as far as it can go without waiting, saving after every step
+
+    Collects a finished job, then submits the next stage's job file. Safe to
+    call repeatedly; a job that is still running leaves the run unchanged.
+    """
+    while run["status"] == STATUS_RUNNING:
+        job = current_job(run)
+        if job is not None:
+            state = backend.status(job["id"])
+            if state == JOB_PENDING:
+                break
+            if state == JOB_FAILED:
+                run["status"] = STATUS_FAILED
+                run["message"] = f"Batch job {job['id']} ({job['stage']}) did not complete"
+            else:
+                _apply_results(run, job["stage"], backend.results(job["id"]))
+                _next_stage(run)
+            job["finished"] = time.time()
+            save_run(run)
+            continue
+
+        if run["stage"] == STAGE_DONE:
+            _finish(run)
+            save_run(run)
+            break
+
+        requests = _stage_requests(run, run["stage"])
+        if not requests:
+            _next_stage(run)
+            continue
+
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        display_name = f"{run['run_id']}-{run['stage']}-{len(run['jobs']) + 1}"
+        path = os.path.join(RUNS_DIR, f"{display_name}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+        run["jobs"].append({
+            "id": backend.submit(path, display_name),
+            "stage": run["stage"],
+            "requests": len(requests),
+            "submitted": time.time(),
+            "finished": None,
+        })
+        run["message"] = f"Waiting for {len(requests)} {run['stage']} requests"
+        save_run(run)
+        break
+
+    return run
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+_resumed_keys = set()
+
+
+def _poll(run_id: str, backend: BatchBackend, interval: float):
+    auth_failures = 0
+    while True:
+        run = load_run(run_id)
+        try:
+            run = advance(run, backend)
+            auth_failures = 0
+        except Exception as e:
+            # Transient API errors are retried on the next poll, auth errors only a few times
+            if getattr(e, "code", None) in _AUTH_ERROR_CODES:
+                auth_failures += 1
+            if auth_failures >= MAX_AUTH_FAILURES:
+                run["status"] = STATUS_FAILED
+                run["message"] = f"Stopped polling after {auth_failures} auth errors: {e}"
+            else:
+                run["message"] = f"Last poll failed: {e}"
+            save_run(run)
+        if run["status"] != STATUS_RUNNING:
+            return
+        time.sleep(interval)
+
+
+def start_polling(run_id: str, backend: BatchBackend, interval: float = POLL_INTERVAL_SECONDS) -> bool:
+    """
+    Advance a run on a background thread until it finishes (one poller per run per process)
+
+    Returns:
+        True if a new poller was started
+    """
+    with _pollers_lock:
+        thread = _pollers.get(run_id)
+        if thread is not None and thread.is_alive():
+            return False
+        thread = threading.Thread(target=_poll, args=(run_id, backend, interval), daemon=True)
+        _pollers[run_id] = thread
+        thread.start()
+        return True
+
+
+def resume_polling(key_id: str, backend_factory: Callable[[str], BatchBackend]) -> int:
+    """
+    Restart pollers for unfinished runs submitted with this API key after the app process (re)started
+
+    Only the first call per key in a process does anything, so it is cheap to call on every rerun.
+    Runs submitted with another key wait until a session provides that key.
+
+    Args:
+        key_id: key_fingerprint() of the API key backend_factory uses
+        backend_factory: Builds the backend for a run from its backend name
+    """
+    with _pollers_lock:
+        if key_id in _resumed_keys:
+            return 0
+        _resumed_keys.add(key_id)
+
+    started = 0
+    for entry in list_runs():
+        if entry["status"] != STATUS_RUNNING or entry.get("key_id") != key_id:
+            continue
+        if start_polling(entry["run_id"], backend_factory(entry["backend"])):
+            started += 1
+    return started
+
+
+def run_summary(run: Dict) -> Dict:
+    """
+    Progress counts for display
+    """
+    items = list(run["items"].values())
+    return {
+        "events": len(run["events"]),
+        "speakers": len(items),
+        "completed": sum(1 for item in items if item["record"]),
+        "errors": sum(1 for item in items if item["error"]),
+        "jobs": len(run["jobs"]),
+        "requests": sum(job["requests"] for job in run["jobs"]),
+    }
+
+
+def run_records(run: Dict, event_id: str) -> List[Dict]:
+    """
+    Finished booklet records of one event, in roster order
+    """
+    return [
+        item["record"] for item in run["items"].values()
+        if item["event"] == event_id and item["record"]
+    ]
+
+
+def run_errors(run: Dict) -> List[str]:
+    return [
+        f"{item['event']} {item['speaker']}: {item['error']}"
+        for item in run["items"].values() if item["error"]
+    ]
+
+
+def merge_into_cache(run: Dict, cache: Dict[str, Dict]):
+    """
+    Store a run's extractions and booklets so later interactive runs can reuse them
+    """
+    for item in run["items"].values():
+        if item["extraction"] is not None:
+            cache["extractions"][item["extraction_key"]] = item["extraction"]
+        if item["record"]:
+            cache["booklets"][item["booklet_key"]] = item["record"]
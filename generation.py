@@ -0,0 +1,156 @@
+"""
+Booklet Generation Module
+Gemini calls for speaker extraction and structured booklets, free of Streamlit state
+so they can run from worker threads
+"""
+
+import json
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from google import genai
+
+from cassette import cassette_call
+from booklet_schema import (
+    MAX_REPAIR_ATTEMPTS, build_repair_prompt, parse_sections, render_booklet,
+    response_schema, structured_config, validate_sections,
+)
+from prompts import HOST_DETAILS, booklet_context, build_extraction_prompt, build_structured_booklet_prompt
+from quota_scheduler import PRIORITY_BATCH, WaitCallback, get_scheduler
+from rsvp_loader import build_speaker_details
+
+MODEL = "gemini-3-pro-preview"
+
+
+class ReplayedResponse:
+    """Stand-in for a generate_content response served from a cassette"""
+
+    parsed = None
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+@lru_cache(maxsize=8)
+def get_client(api_key: str) -> genai.Client:
+    """
+    Gemini client shared by every session using this key, so its connection pool stays warm
+    """
+    return genai.Client(api_key=api_key)
+
+
+def build_roster(df: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Speaker details for every attendee plus the host
+    """
+    speaker_rsvp_details = build_speaker_details(df)
+    speaker_rsvp_details["Host"] = dict(HOST_DETAILS)
+    return speaker_rsvp_details
+
+
+def generate_content(
+    client,
+    contents: str,
+    session_id: str,
+    wait_callback: Optional[WaitCallback] = None,
+    priority: int = PRIORITY_BATCH,
+    config: Optional[Dict] = None
+):
+    """
+    Call Gemini once the shared per-process quota allows it
+    """
+    get_scheduler().acquire("gemini", session_id, priority, wait_callback)
+    return cassette_call(
+        "gemini",
+        {"model": MODEL, "contents": contents, "config": config},
+        lambda: client.models.generate_content(
+            model=MODEL,
+            contents=contents,
+            config=config,
+        ),
+        encode=lambda response: {"text": response_text(response)},
+        decode=lambda payload: ReplayedResponse(payload["text"]),
+    )
+
+
+def response_text(response) -> str:
+    """
+    Text of a response, falling back to its serialized form
+    """
+    try:
+        return response.text
+    except Exception:
+        return json.dumps(response, default=str)
+
+
+def extract_speaker_transcript(
+    client,
+    speaker_details: Dict,
+    transcripts: str,
+    session_id: str,
+    wait_callback: Optional[WaitCallback] = None,
+    priority: int = PRIORITY_BATCH
+) -> str:
+    """
+    Pull one attendee's part of the meeting out of the full transcript
+    """
+    response = generate_content(
+        client,
+        build_extraction_prompt(speaker_details, transcripts),
+        session_id,
+        wait_callback,
+        priority,
+    )
+    return response_text(response)
+
+
+def generate_booklet_sections(
+    client,
+    speaker: str,
+    speaker_rsvp_details: Dict[str, Dict],
+    speaker_transcripts: str,
+    it_date: str,
+    session_id: str,
+    wait_callback: Optional[WaitCallback] = None,
+    on_repair: Optional[Callable[[List[str]], None]] = None,
+    priority: int = PRIORITY_BATCH
+) -> Tuple[Dict, List[str]]:
+    """
+    Request the booklet as structured sections, re-requesting only the sections that fail validation
+
+    Returns:
+        Tuple of (sections dict, list of section names still failing)
+    """
+    prompt = build_structured_booklet_prompt(speaker, speaker_rsvp_details, speaker_transcripts, it_date)
+    response = generate_content(
+        client, prompt, session_id, wait_callback, priority, config=structured_config(response_schema())
+    )
+    sections = parse_sections(response)
+    failed = validate_sections(sections)
+
+    for _ in range(MAX_REPAIR_ATTEMPTS):
+        if not failed:
+            break
+        if on_repair:
+            on_repair(failed)
+        response = generate_content(
+            client,
+            build_repair_prompt(prompt, sections, failed),
+            session_id,
+            wait_callback,
+            priority,
+            config=structured_config(response_schema(failed)),
+        )
+        repaired = parse_sections(response)
+        sections.update({name: repaired[name] for name in failed if name in repaired})
+        failed = validate_sections(sections)
+
+    return sections, failed
+
+
+def render_sections(sections: Dict, speaker_rsvp_details: Dict[str, Dict], it_date: str) -> str:
+    """
+    Render validated sections into the booklet text for this event
+    """
+    return render_booklet(sections, booklet_context(speaker_rsvp_details, it_date))
@@ -6,21 +6,75 @@ Handles fetching contact details from GoHighLevel CRM
 import requests
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
+import threading
 import time
+from cassette import cassette_call
+from quota_scheduler import PRIORITY_INTERACTIVE, WaitCallback, get_scheduler
+
+
+FIELD_MAP_TTL_SECONDS = 15 * 60
+
+# location_id -> (loaded_at, field map), shared by every client in this process
+_field_map_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_field_map_lock = threading.Lock()
+
+# Pooled HTTP session so warmed-up TLS connections are reused across calls and sessions
+_http = requests.Session()
+
+
+def _encode_response(response: requests.Response) -> Dict:
+    return {"status": response.status_code, "url": response.url, "body": response.text}
+
+
+def _decode_response(payload: Dict) -> requests.Response:
+    """
+    Rebuild a recorded response so raise_for_status() and json() behave as they did live
+    """
+    response = requests.Response()
+    response.status_code = payload["status"]
+    response.url = payload["url"]
+    response.reason = "Replayed"
+    response.encoding = "utf-8"
+    response._content = payload["body"].encode("utf-8")
+    return response
 
 
 class GoHighLevelClient:
     BASE_URL = "https://services.leadconnectorhq.com"
 
-    def __init__(self, api_key: str, location_id: str):
+    def __init__(
+        self,
+        api_key: str,
+        location_id: str,
+        session_id: str = "default",
+        priority: int = PRIORITY_INTERACTIVE,
+        wait_callback: Optional[WaitCallback] = None,
+    ):
         self.location_id = location_id
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Version": "2021-07-28",
             "Content-Type": "application/json",
         }
+        self.session_id = session_id
+        self.priority = priority
+        self.wait_callback = wait_callback
         self._custom_field_map = None
     
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request once the shared GHL quota allows it
+        """
+        get_scheduler().acquire("ghl", self.session_id, self.priority, self.wait_callback)
+        return cassette_call(
+            "ghl",
+            {"method": method, "url": url, "json": kwargs.get("json")},
+            lambda: _http.request(method, url, headers=self.headers, **kwargs),
+            encode=_encode_response,
+            decode=_decode_response,
+            error_type=requests.exceptions.ConnectionError,
+        )
+    
     def get_custom_fields_map(self) -> Dict[str, str]:
         """
         Fetch custom field definitions and create ID -> Name mapping
@@ -29,10 +83,16 @@ class GoHighLevelClient:
         if self._custom_field_map is not None:
             return self._custom_field_map
         
+        with _field_map_lock:
+            cached = _field_map_cache.get(self.location_id)
+        if cached and time.monotonic() - cached[0] < FIELD_MAP_TTL_SECONDS:
+            self._custom_field_map = cached[1]
+            return self._custom_field_map
+        
         url = f"{self.BASE_URL}/locations/{self.location_id}/customFields"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             data = response.json()
             
@@ -46,6 +106,8 @@ class GoHighLevelClient:
                     field_map[field_id] = field_name
             
             self._custom_field_map = field_map
+            with _field_map_lock:
+                _field_map_cache[self.location_id] = (time.monotonic(), field_map)
             return field_map
             
         except requests.exceptions.RequestException as e:
@@ -64,7 +126,7 @@ class GoHighLevelClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self._request("POST", url, json=payload)
             response.raise_for_status()
             data = response.json()
 
@@ -86,7 +148,7 @@ class GoHighLevelClient:
         url = f"{self.BASE_URL}/contacts/{contact_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             return response.json().get("contact")
             
@@ -117,19 +179,63 @@ def parse_custom_fields(custom_fields_raw, field_map: Dict[str, str]) -> Dict[st
     return result
 
 
+def build_participant(contact: Dict, field_map: Dict[str, str]) -> Dict[str, str]:
+    """
+    Map a GHL contact onto the RSVP column layout
+    """
+    custom_fields_raw = contact.get("customFields", [])
+    custom_fields = parse_custom_fields(custom_fields_raw, field_map)
+    
+    return {
+        "First name": contact.get("firstName", ""),
+        "Last name": contact.get("lastName", ""),
+        "Email": contact.get("email", ""),
+        "Phone": contact.get("phone", ""),
+        "Company Name": contact.get("companyName", ""),
+        "Industry": custom_fields.get("Industry", ""),
+        "Role": custom_fields.get("Role", ""),
+        "What their company solves.": custom_fields.get("Solution", ""),
+        "What is the biggest challenge you are currently facing in your business?": custom_fields.get("Biggest Challenge", ""),
+        "What is your superpower—the one thing you do exceptionally well that could help others?": custom_fields.get("Superpower", ""),
+    }
+
+
+def fetch_participant(client: GoHighLevelClient, email: str, field_map: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Look up one participant by email, returning None if not found
+    """
+    contact = client.search_contact_by_email(email)
+    
+    if not contact:
+        return None
+    
+    # Get full contact details
+    full_contact = client.get_contact_by_id(contact.get("id"))
+    
+    if full_contact:
+        contact = full_contact
+    
+    return build_participant(contact, field_map)
+
+
 def fetch_participants_from_ghl(
     api_key: str,
     location_id: str,
     emails: List[str],
-    progress_callback=None
+    progress_callback=None,
+    session_id: str = "default",
+    wait_callback: Optional[WaitCallback] = None
 ) -> Tuple[pd.DataFrame, List[str]]:
     """
     Fetch participant details from GoHighLevel by email
     
+    Requests are paced by the process-wide quota scheduler, so concurrent
+    sessions share the GHL rate limit instead of each sleeping on its own.
+    
     Returns:
         Tuple of (DataFrame, list of status messages)
     """
-    client = GoHighLevelClient(api_key, location_id)
+    client = GoHighLevelClient(api_key, location_id, session_id, PRIORITY_INTERACTIVE, wait_callback)
     messages = []
     
     # Get custom field definitions
@@ -149,33 +255,9 @@ def fetch_participants_from_ghl(
         if progress_callback:
             progress_callback((idx + 1) / len(emails))
         
-        contact = client.search_contact_by_email(email)
+        participant = fetch_participant(client, email, field_map)
         
-        if contact:
-            contact_id = contact.get("id")
-            
-            # Get full contact details
-            full_contact = client.get_contact_by_id(contact_id)
-            
-            if full_contact:
-                contact = full_contact
-            
-            # Parse custom fields
-            custom_fields_raw = contact.get("customFields", [])
-            custom_fields = parse_custom_fields(custom_fields_raw, field_map)
-            
-            participant = {
-                "First name": contact.get("firstName", ""),
-                "Last name": contact.get("lastName", ""),
-                "Email": contact.get("email", ""),
-                "Phone": contact.get("phone", ""),
-                "Company Name": contact.get("companyName", ""),
-                "Industry": custom_fields.get("Industry", ""),
-                "Role": custom_fields.get("Role", ""),
-                "What their company solves.": custom_fields.get("Solution", ""),
-                "What is the biggest challenge you are currently facing in your business?": custom_fields.get("Biggest Challenge", ""),
-                "What is your superpower—the one thing you do exceptionally well that could help others?": custom_fields.get("Superpower", ""),
-            }
+        if participant:
             participants.append(participant)
             
             name = f"{participant['First name']} {participant['Last name']}"
@@ -183,30 +265,8 @@ def fetch_participants_from_ghl(
             
         else:
             messages.append(f"   ❌ Not found: {email}")
-        
-        time.sleep(0.2)
     
     messages.append(f"\n{'='*50}")
     messages.append(f"✅ Total participants fetched: {len(participants)}")
     
     return pd.DataFrame(participants), messages
-
-
-def test_ghl_connection(api_key: str, location_id: str) -> bool:
-    """
-    Test GoHighLevel API connection
-    """
-    client = GoHighLevelClient(api_key, location_id)
-    url = f"{client.BASE_URL}/contacts/search"
-
-    payload = {
-        "locationId": location_id,
-        "pageLimit": 1
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=client.headers)
-        response.raise_for_status()
-        return True
-    except:
-        return False
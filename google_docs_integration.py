@@ -1,7 +1,10 @@
 import streamlit as st
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from google.auth.transport.requests import Request
 import os
+import threading
+from cassette import cassette_call
 
 # Scopes required for Google Docs and Drive API
 SCOPES = [
@@ -10,10 +13,30 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.file'
 ]
 
+# Credentials and API services are built once per process and reused.
+# googleapiclient services share one HTTP connection that is not thread-safe,
+# so every call sequence on them runs under _service_lock.
+_credentials = None
+_services = {}
+_service_lock = threading.RLock()
+
+
 def get_credentials():
     """
     Authenticate and get credentials for Google Docs API.
     Uses Streamlit secrets for deployment or local credentials.json for development.
+    The result is cached for the lifetime of the process.
+    """
+    global _credentials
+    with _service_lock:
+        if _credentials is None:
+            _credentials = _load_credentials()
+        return _credentials
+
+
+def _load_credentials():
+    """
+    Build service account credentials from Streamlit secrets or credentials.json.
     """
     # Try Streamlit secrets first (for deployment)
     if "google_credentials" in st.secrets:
@@ -39,6 +62,43 @@ def get_credentials():
     )
 
 
+def get_service(name, version):
+    """
+    Get a cached Google API service (e.g. 'drive', 'v3'), building it on first use.
+    """
+    with _service_lock:
+        key = (name, version)
+        if key not in _services:
+            _services[key] = build(name, version, credentials=get_credentials())
+        return _services[key]
+
+
+def warm_up_google():
+    """
+    Load credentials, fetch an access token and build the Drive and Docs services
+    so the first export skips the setup work.
+    """
+    with _service_lock:
+        creds = get_credentials()
+        if not creds.valid:
+            creds.refresh(Request())
+        get_service('drive', 'v3')
+        get_service('docs', 'v1')
+
+
+def _execute(operation, params, make_request):
+    """
+    Run one API call under the service lock, through the active cassette if any.
+    The service is only touched inside make_request, so replays need no credentials.
+    """
+    with _service_lock:
+        return cassette_call(
+            'google',
+            {'operation': operation, **params},
+            lambda: make_request().execute()
+        )
+
+
 def create_google_doc(title, content, folder_id="0AIKRNYJ7JQZnUk9PVA"):
     """
     Create a new Google Doc with the given title and content.
@@ -54,13 +114,6 @@ def create_google_doc(title, content, folder_id="0AIKRNYJ7JQZnUk9PVA"):
         dict: Dictionary containing document_id and document_url
     """
     try:
-        # Get credentials
-        creds = get_credentials()
-        
-        # Build the Drive and Docs API services
-        drive_service = build('drive', 'v3', credentials=creds)
-        docs_service = build('docs', 'v1', credentials=creds)
-        
         # Create document metadata with parent folder
         file_metadata = {
             'name': title,
@@ -69,11 +122,15 @@ def create_google_doc(title, content, folder_id="0AIKRNYJ7JQZnUk9PVA"):
         }
         
         # Create the document using Drive API (in the specified folder)
-        file = drive_service.files().create(
-            body=file_metadata,
-            fields='id',
-            supportsAllDrives=True
-        ).execute()
+        file = _execute(
+            'drive.files.create',
+            {'body': file_metadata},
+            lambda: get_service('drive', 'v3').files().create(
+                body=file_metadata,
+                fields='id',
+                supportsAllDrives=True
+            )
+        )
         
         document_id = file.get('id')
         
@@ -90,10 +147,14 @@ def create_google_doc(title, content, folder_id="0AIKRNYJ7JQZnUk9PVA"):
         ]
         
         # Execute the batch update
-        docs_service.documents().batchUpdate(
-            documentId=document_id,
-            body={'requests': requests}
-        ).execute()
+        _execute(
+            'docs.documents.batchUpdate',
+            {'documentId': document_id, 'body': {'requests': requests}},
+            lambda: get_service('docs', 'v1').documents().batchUpdate(
+                documentId=document_id,
+                body={'requests': requests}
+            )
+        )
         
         document_url = f'https://docs.google.com/document/d/{document_id}/edit'
         
@@ -128,14 +189,12 @@ def append_to_google_doc(document_id, content):
         dict: Status dictionary
     """
     try:
-        # Get credentials
-        creds = get_credentials()
-        
-        # Build the Docs API service
-        service = build('docs', 'v1', credentials=creds)
-        
         # Get the current document to find the end index
-        doc = service.documents().get(documentId=document_id).execute()
+        doc = _execute(
+            'docs.documents.get',
+            {'documentId': document_id},
+            lambda: get_service('docs', 'v1').documents().get(documentId=document_id)
+        )
         end_index = doc.get('body').get('content')[-1].get('endIndex') - 1
         
         # Prepare request to append content
@@ -151,10 +210,14 @@ def append_to_google_doc(document_id, content):
         ]
         
         # Execute the batch update
-        service.documents().batchUpdate(
-            documentId=document_id,
-            body={'requests': requests}
-        ).execute()
+        _execute(
+            'docs.documents.batchUpdate',
+            {'documentId': document_id, 'body': {'requests': requests}},
+            lambda: get_service('docs', 'v1').documents().batchUpdate(
+                documentId=document_id,
+                body={'requests': requests}
+            )
+        )
         
         return {
             'success': True,
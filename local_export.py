@@ -0,0 +1,292 @@
+"""
+Local Export Module
+Renders booklets in memory into DOCX (and optionally PDF) files, with no network round trips
+"""
+
+import io
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from result_store import booklet_filename
+
+try:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+EXPORT_FORMATS = ["docx", "pdf", "txt"] if PDF_AVAILABLE else ["docx", "txt"]
+
+# Top-level headings of the booklet template
+HEADINGS = {
+    "What Happened at Your Table",
+    "Your Situation: What We Heard",
+    "Key Insights from the Table",
+    "Your 7-Day Action Plan",
+    "Connections to Make",
+    "What Others Are Saying",
+    "What's Next: Your Full Strategic Mirror Document",
+}
+
+# Sub-headings whose following lines (until a blank line) are bullet lists
+BULLET_SECTIONS = {
+    "What We Observed:",
+    "Resources Mentioned:",
+    "Your Full Strategic Mirror Document includes:",
+    "To receive your complete Strategic Mirror Document:",
+    "We would love to hear about:",
+}
+
+_SUBHEADING_RE = re.compile(r"^[A-Z][^.!?]{2,80}:$")
+_NUMBERED_RE = re.compile(r"^(Insight|Action) #\d+:")
+_FIELD_RE = re.compile(
+    r"^(Company|Industry|Current Revenue|Team Size|Time in Business|Why|How|Deadline|"
+    r"Why connect|Suggested approach|Week 1|Week 2|30 Days|Email|Text|Why this matters):\s+(.*)$"
+)
+
+Block = Tuple[str, str, str]
+
+
+def booklet_blocks(text: str) -> List[Block]:
+    """
+    Classify booklet lines into (kind, label, text) blocks
+
+    Kinds: title, subtitle, heading, subheading, item_heading, field, bullet, check, paragraph.
+    Works on any booklet text in the template layout, structured or free-text.
+    """
+    blocks = []
+    in_bullets = False
+    seen = 0
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            in_bullets = False
+            continue
+        seen += 1
+        if seen == 1 and "Confidential" in line:
+            blocks.append(("subtitle", "", line))
+        elif seen <= 2 and "Strategic Brief" in line:
+            blocks.append(("title", "", line))
+        elif line in HEADINGS:
+            blocks.append(("heading", "", line))
+            in_bullets = False
+        elif line.startswith("☐"):
+            blocks.append(("check", "", line))
+        elif _NUMBERED_RE.match(line):
+            blocks.append(("item_heading", "", line))
+        elif line in BULLET_SECTIONS:
+            blocks.append(("subheading", "", line))
+            in_bullets = True
+        elif _FIELD_RE.match(line):
+            label, value = _FIELD_RE.match(line).groups()
+            blocks.append(("field", label, value))
+        elif _SUBHEADING_RE.match(line):
+            blocks.append(("subheading", "", line))
+        elif in_bullets or line.startswith(("- ", "• ")):
+            blocks.append(("bullet", "", line.lstrip("-• ").strip()))
+        else:
+            blocks.append(("paragraph", "", line))
+    return blocks
+
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>
+</Types>"""
+
+_PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>
+</Relationships>"""
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _style(style_id: str, name: str, size: int, bold: bool = False, space_before: int = 0, extra: str = "") -> str:
+    return (
+        f'<w:style w:type="paragraph" w:styleId="{style_id}"><w:name w:val="{name}"/>'
+        f'<w:basedOn w:val="Normal"/><w:qFormat/>'
+        f'<w:pPr><w:spacing w:before="{space_before}" w:after="80"/>{extra}</w:pPr>'
+        f'<w:rPr>{"<w:b/>" if bold else ""}<w:sz w:val="{size}"/></w:rPr></w:style>'
+    )
+
+
+_STYLES = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:styles {_W}>'
+    '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/></w:rPr></w:rPrDefault></w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+    '<w:pPr><w:spacing w:after="80"/></w:pPr></w:style>'
+    + _style("Title", "Title", 40, bold=True)
+    + _style("Subtitle", "Subtitle", 20)
+    + _style("Heading1", "heading 1", 30, bold=True, space_before=320)
+    + _style("Heading2", "heading 2", 24, bold=True, space_before=200)
+    + _style("Heading3", "heading 3", 22, bold=True, space_before=120)
+    + _style("ListBullet", "List Bullet", 22, extra='<w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr>')
+    + '</w:styles>'
+)
+
+_NUMBERING = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:numbering {_W}>'
+    '<w:abstractNum w:abstractNumId="0"><w:lvl w:ilvl="0"><w:start w:val="1"/>'
+    '<w:numFmt w:val="bullet"/><w:lvlText w:val="•"/><w:lvlJc w:val="left"/>'
+    '<w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl></w:abstractNum>'
+    '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num></w:numbering>'
+)
+
+_DOCX_STYLES = {
+    "title": "Title",
+    "subtitle": "Subtitle",
+    "heading": "Heading1",
+    "subheading": "Heading2",
+    "item_heading": "Heading3",
+    "bullet": "ListBullet",
+}
+
+
+def _run(text: str, bold: bool = False) -> str:
+    props = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    return f'<w:r>{props}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def _docx_paragraph(kind: str, label: str, text: str) -> str:
+    style = _DOCX_STYLES.get(kind)
+    props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    runs = _run(f"{label}: ", bold=True) + _run(text) if kind == "field" else _run(text)
+    return f"<w:p>{props}{runs}</w:p>"
+
+
+def render_docx(text: str) -> bytes:
+    """
+    Render booklet text into DOCX bytes with template headings and bullet lists
+    """
+    body = "".join(_docx_paragraph(*block) for block in booklet_blocks(text))
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_W}><w:body>{body}'
+        '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+        '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440"/></w:sectPr>'
+        '</w:body></w:document>'
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _PACKAGE_RELS)
+        archive.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", _STYLES)
+        archive.writestr("word/numbering.xml", _NUMBERING)
+    return buffer.getvalue()
+
+
+def render_pdf(text: str) -> bytes:
+    """
+    Render booklet text into PDF bytes (requires reportlab)
+    """
+    if not PDF_AVAILABLE:
+        raise RuntimeError("PDF export requires the reportlab package")
+
+    styles = getSampleStyleSheet()
+    pdf_styles = {
+        "title": styles["Title"],
+        "subtitle": styles["Italic"],
+        "heading": styles["Heading1"],
+        "subheading": styles["Heading2"],
+        "item_heading": styles["Heading3"],
+    }
+
+    story = []
+    bullets = []
+
+    def flush_bullets():
+        if bullets:
+            story.append(ListFlowable(
+                [ListItem(Paragraph(escape(item), styles["BodyText"])) for item in bullets],
+                bulletType="bullet",
+            ))
+            bullets.clear()
+
+    for kind, label, line in booklet_blocks(text):
+        if kind == "bullet":
+            bullets.append(line)
+            continue
+        flush_bullets()
+        if kind == "field":
+            story.append(Paragraph(f"<b>{escape(label)}:</b> {escape(line)}", styles["BodyText"]))
+        else:
+            story.append(Paragraph(escape(line), pdf_styles.get(kind, styles["BodyText"])))
+    flush_bullets()
+    story.append(Spacer(1, 12))
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    return buffer.getvalue()
+
+
+def render_txt(text: str) -> bytes:
+    """
+    Booklet text as UTF-8 bytes
+    """
+    return text.encode("utf-8")
+
+
+RENDERERS = {
+    "docx": render_docx,
+    "pdf": render_pdf,
+    "txt": render_txt,
+}
+
+MIME_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "txt": "text/plain",
+}
+
+
+def _render_record(record: Dict, prefix: str, formats: Sequence[str]) -> List[Tuple[str, bytes]]:
+    return [
+        (booklet_filename(record, prefix, extension), RENDERERS[extension](record["booklet"]))
+        for extension in formats
+    ]
+
+
+def build_export_zip(records: List[Dict], prefix: str, formats: Sequence[str] = ("docx",), workers: int = 4) -> bytes:
+    """
+    Render every booklet in parallel and pack the files into one in-memory ZIP
+
+    Rendering is CPU-bound Python, so it runs in worker processes rather than
+    threads. A single booklet is rendered in-process to skip the pool startup.
+    """
+    render = partial(_render_record, prefix=prefix, formats=tuple(formats))
+    workers = min(workers, len(records))
+    if workers <= 1:
+        rendered = [render(record) for record in records]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render, records))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for files in rendered:
+            for filename, data in files:
+                # DOCX/PDF files are already compressed, so only text is deflated
+                compression = zipfile.ZIP_DEFLATED if filename.endswith(".txt") else zipfile.ZIP_STORED
+                archive.writestr(filename, data, compress_type=compression)
+    return buffer.getvalue()
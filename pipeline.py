@@ -0,0 +1,258 @@
+"""
+Streaming Pipeline Module
+GHL fetch -> speaker extraction -> booklet -> export, connected by bounded queues
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from prompts import HOST_DETAILS
+from quota_scheduler import WaitCallback
+from rsvp_loader import speaker_details_from_row
+
+# fetch_fn(email, wait_callback) -> participant row or None
+FetchFn = Callable[[str, Optional[WaitCallback]], Optional[Dict]]
+# extract_fn(speaker_details, wait_callback) -> speaker transcript text
+ExtractFn = Callable[[Dict, Optional[WaitCallback]], str]
+# booklet_fn(speaker, roster, speaker_transcripts, extract_seconds, wait_callback) -> record or None
+BookletFn = Callable[[str, Dict[str, Dict], str, float, Optional[WaitCallback]], Optional[Dict]]
+# export_fn(record) -> export result dict
+ExportFn = Callable[[Dict], Dict]
+
+STAGES = ["fetch", "extract", "booklet", "export"]
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.first_started = None
+        self.last_finished = None
+        self._lock = threading.Lock()
+
+    def record(self, started: float, finished: float, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.items += 1
+            else:
+                self.errors += 1
+            self.busy_seconds += finished - started
+            if self.first_started is None or started < self.first_started:
+                self.first_started = started
+            if self.last_finished is None or finished > self.last_finished:
+                self.last_finished = finished
+
+    def as_dict(self) -> Dict:
+        wall = (self.last_finished - self.first_started) if self.first_started is not None else 0.0
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 2),
+            "wall_seconds": round(wall, 2),
+            "items_per_minute": round(self.items * 60 / wall, 2) if wall > 0 else 0.0,
+        }
+
+
+class StreamingPipeline:
+    """
+    Runs each participant through the stages as soon as its input is ready.
+
+    Extraction starts as soon as a participant's GHL record arrives. Booklets
+    need the full attendee roster, so that stage waits for the fetch stage to
+    finish; its input queue is therefore sized to hold every participant.
+    Every other queue is bounded so a fast stage blocks instead of piling up
+    work ahead of a slow one.
+    """
+
+    def __init__(
+        self,
+        fetch_fn: FetchFn,
+        extract_fn: ExtractFn,
+        booklet_fn: BookletFn,
+        export_fn: Optional[ExportFn] = None,
+        queue_size: int = 2,
+        workers: Optional[Dict[str, int]] = None
+    ):
+        self.fetch_fn = fetch_fn
+        self.extract_fn = extract_fn
+        self.booklet_fn = booklet_fn
+        self.export_fn = export_fn
+        self.queue_size = queue_size
+        self.workers = {"extract": 2, "booklet": 2, "export": 1}
+        self.workers.update(workers or {})
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.roster = {}
+        self.events = queue.Queue()
+        self._roster_ready = threading.Event()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Stop starting new work; items already queued are drained without being processed
+        """
+        self._stop.set()
+
+    def _emit(self, kind: str, *payload):
+        self.events.put((kind,) + payload)
+
+    def _wait_callback(self, stage: str) -> WaitCallback:
+        def callback(service, position, eta):
+            self._emit("queue", stage, service, position, eta)
+        return callback
+
+    def _fetch_stage(self, emails: List[str], outbox: queue.Queue):
+        wait = self._wait_callback("fetch")
+        try:
+            for email in emails:
+                if self._stop.is_set():
+                    break
+                started = time.perf_counter()
+                try:
+                    row = self.fetch_fn(email, wait)
+                except Exception as e:
+                    self.stats["fetch"].record(started, time.perf_counter(), ok=False)
+                    self._emit("error", "fetch", email, str(e))
+                    continue
+                self.stats["fetch"].record(started, time.perf_counter(), ok=row is not None)
+
+                if row is None:
+                    self._emit("not_found", email)
+                    continue
+
+                speaker = f"Speaker {len(self.roster) + 1}"
+                details = speaker_details_from_row(row)
+                self.roster[speaker] = details
+                self._emit("fetched", speaker, details["name"])
+                outbox.put((speaker, details))
+        finally:
+            self.roster["Host"] = dict(HOST_DETAILS)
+            self._roster_ready.set()
+            for _ in range(self.workers["extract"]):
+                outbox.put(_DONE)
+
+    def _extract_worker(self, inbox: queue.Queue, outbox: queue.Queue):
+        wait = self._wait_callback("extract")
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            if self._stop.is_set():
+                continue
+            speaker, details = item
+            started = time.perf_counter()
+            try:
+                speaker_transcripts = self.extract_fn(details, wait)
+            except Exception as e:
+                self.stats["extract"].record(started, time.perf_counter(), ok=False)
+                self._emit("error", "extract", speaker, str(e))
+                continue
+            finished = time.perf_counter()
+
+            if len(speaker_transcripts) < 20:
+                self.stats["extract"].record(started, finished, ok=False)
+                self._emit("error", "extract", speaker, "Speaker transcripts look empty or too short.")
+                continue
+            self.stats["extract"].record(started, finished)
+            self._emit("extracted", speaker)
+            outbox.put((speaker, speaker_transcripts, finished - started))
+
+    def _booklet_worker(self, inbox: queue.Queue, outbox: queue.Queue):
+        wait = self._wait_callback("booklet")
+        self._roster_ready.wait()
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            if self._stop.is_set():
+                continue
+            speaker, speaker_transcripts, extract_seconds = item
+            started = time.perf_counter()
+            try:
+                record = self.booklet_fn(speaker, self.roster, speaker_transcripts, extract_seconds, wait)
+            except Exception as e:
+                record = None
+                self._emit("error", "booklet", speaker, str(e))
+            self.stats["booklet"].record(started, time.perf_counter(), ok=record is not None)
+            if record is None:
+                continue
+            self._emit("booklet", record)
+            outbox.put(record)
+
+    def _export_worker(self, inbox: queue.Queue):
+        while True:
+            record = inbox.get()
+            if record is _DONE:
+                return
+            if self.export_fn is None or self._stop.is_set():
+                continue
+            started = time.perf_counter()
+            try:
+                result = self.export_fn(record)
+            except Exception as e:
+                result = {"success": False, "message": str(e)}
+            self.stats["export"].record(started, time.perf_counter(), ok=result.get("success", False))
+            self._emit("exported", record, result)
+
+    def _run_stage(self, target, count: int, args: Tuple, downstream: Optional[queue.Queue], downstream_workers: int):
+        """
+        Start `count` workers and, once they all finish, signal the next stage
+        """
+        threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+
+        def close():
+            for thread in threads:
+                thread.join()
+            if downstream is not None:
+                for _ in range(downstream_workers):
+                    downstream.put(_DONE)
+
+        closer = threading.Thread(target=close, daemon=True)
+        closer.start()
+        return closer
+
+    def run(self, emails: List[str]) -> Iterator[Tuple]:
+        """
+        Start every stage and yield progress events until the last export finishes
+
+        Events are yielded to the calling thread, so UI updates stay on the
+        Streamlit script thread. If the caller stops consuming (the generator is
+        closed, e.g. on a script rerun), every stage stops taking on new work:
+            ("fetched", speaker, name), ("not_found", email),
+            ("extracted", speaker), ("booklet", record), ("exported", record, result),
+            ("queue", stage, service, position, eta), ("error", stage, item, message)
+        """
+        extract_queue = queue.Queue(maxsize=self.queue_size)
+        booklet_queue = queue.Queue(maxsize=max(self.queue_size, len(emails)))
+        export_queue = queue.Queue(maxsize=self.queue_size)
+
+        fetcher = threading.Thread(target=self._fetch_stage, args=(emails, extract_queue), daemon=True)
+        fetcher.start()
+        self._run_stage(self._extract_worker, self.workers["extract"], (extract_queue, booklet_queue),
+                        booklet_queue, self.workers["booklet"])
+        self._run_stage(self._booklet_worker, self.workers["booklet"], (booklet_queue, export_queue),
+                        export_queue, self.workers["export"])
+        exporter = self._run_stage(self._export_worker, self.workers["export"], (export_queue,), None, 0)
+
+        try:
+            while exporter.is_alive() or not self.events.empty():
+                try:
+                    yield self.events.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+        finally:
+            self.stop()
+
+    def stage_stats(self) -> List[Dict]:
+        """
+        Per-stage item counts, busy time and throughput
+        """
+        return [self.stats[name].as_dict() for name in STAGES]
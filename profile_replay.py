@@ -0,0 +1,106 @@
+"""
+Replay Profiling Module
+Re-runs a recorded session offline from a cassette under cProfile, so the
+local hot paths can be measured without network noise or API costs
+
+Record a session with:
+    CASSETTE_MODE=record CASSETTE_PATH=run.jsonl streamlit run streamlit_app.py
+Then profile it with:
+    python profile_replay.py run.jsonl --zero-latency
+"""
+
+import argparse
+import cProfile
+import pstats
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from cassette import MODE_REPLAY, CassetteMiss, use_cassette
+from generation import build_roster, extract_speaker_transcript, generate_booklet_sections, get_client, render_sections
+from ghl_integration import fetch_participants_from_ghl
+from quota_scheduler import reset_scheduler
+
+SESSION_ID = "replay"
+
+# Limits high enough that the scheduler never waits on replayed calls
+UNTHROTTLED_LIMITS = {"gemini": (1e6, 1_000_000), "ghl": (1e6, 1_000_000)}
+
+
+def replay_fetch(meta: Dict) -> pd.DataFrame:
+    df, messages = fetch_participants_from_ghl(
+        "replay", meta["location_id"], meta["identifiers"], session_id=SESSION_ID
+    )
+    print(f"GHL fetch: {len(df)} participants ({len(messages)} log lines)")
+    return df
+
+
+def replay_generation(meta: Dict, df: pd.DataFrame) -> List[str]:
+    """
+    Headless version of the app's generation loop; returns the rendered booklets
+    """
+    client = get_client("replay")
+    transcripts = meta["transcripts"]
+    it_date = meta["it_date"]
+    roster = build_roster(df)
+    booklets = []
+
+    for speaker, details in roster.items():
+        # The app never generates a booklet for the host
+        if speaker == "Host":
+            continue
+        try:
+            speaker_transcripts = extract_speaker_transcript(client, details, transcripts, SESSION_ID)
+            sections, failed = generate_booklet_sections(
+                client, speaker, roster, speaker_transcripts, it_date, SESSION_ID
+            )
+        except CassetteMiss:
+            # The recorded run reused a cached result for this speaker
+            print(f"{speaker}: not in the cassette, skipped")
+            continue
+        if failed:
+            print(f"{speaker}: missing sections {', '.join(failed)}")
+            continue
+        booklets.append(render_sections(sections, roster, it_date))
+    print(f"Generation: {len(booklets)} booklets rendered")
+    return booklets
+
+
+def replay(path: str, replay_latency: bool):
+    with use_cassette(path, MODE_REPLAY, replay_latency) as cassette:
+        if not cassette.meta:
+            raise SystemExit(f"{path} has no recorded run inputs to replay")
+        meta = cassette.meta
+        if "ghl_fetch" in meta:
+            replay_fetch(meta["ghl_fetch"])
+        if "generation" in meta:
+            replay_generation(meta["generation"], pd.DataFrame(meta["generation"]["rows"]))
+        if "streaming" in meta:
+            # The pipeline interleaves these calls; replay matches them by request, not order
+            replay_generation(meta["streaming"], replay_fetch(meta["streaming"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded cassette under cProfile")
+    parser.add_argument("cassette", help="Path to a cassette recorded with CASSETTE_MODE=record")
+    parser.add_argument("--zero-latency", action="store_true", help="Answer calls instantly instead of at recorded speed")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (default: cumulative)")
+    parser.add_argument("--limit", type=int, default=40, help="Number of functions to print")
+    parser.add_argument("--output", help="Also save raw profile data to this file")
+    args = parser.parse_args()
+
+    reset_scheduler(UNTHROTTLED_LIMITS)
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.runcall(replay, args.cassette, not args.zero_latency)
+    print(f"Replay finished in {time.perf_counter() - started:.2f}s\n")
+
+    if args.output:
+        profiler.dump_stats(args.output)
+    pstats.Stats(profiler).strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Quota Scheduler Module
+Process-wide token buckets with fair queuing across Streamlit sessions
+"""
+
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# Called as wait_callback(service, queue_position, estimated_wait_seconds)
+WaitCallback = Callable[[str, int, float], None]
+
+DEFAULT_LIMITS = {
+    # service: (requests per second, burst capacity)
+    "gemini": (float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60")) / 60, 5),
+    "ghl": (float(os.getenv("GHL_REQUESTS_PER_SECOND", "8")), 20),
+}
+
+_POLL_INTERVAL = 0.5
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_available(self, now: float) -> float:
+        """
+        Seconds until one token can be taken
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _Ticket:
+    __slots__ = ("session_id", "priority", "tag", "seq")
+
+    def __init__(self, session_id: str, priority: int, tag: int, seq: int):
+        self.session_id = session_id
+        self.priority = priority
+        self.tag = tag
+        self.seq = seq
+
+    def sort_key(self) -> Tuple[int, int, int]:
+        return (self.priority, self.tag, self.seq)
+
+
+class QuotaScheduler:
+    """
+    Grants outbound calls one token at a time per service.
+
+    Waiting calls are ordered by priority, then by a start-time fair queuing
+    tag so that a session with many queued calls cannot starve the others.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, int]]):
+        self._cond = threading.Condition()
+        self._buckets = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in limits.items()}
+        self._waiting = {name: [] for name in limits}
+        self._virtual_time = {name: 0 for name in limits}
+        self._last_tag = {name: {} for name in limits}
+        self._seq = itertools.count()
+
+    def _status(self, service: str, ticket: _Ticket, now: float) -> Tuple[int, float]:
+        """
+        Queue position (1-based) and estimated wait for a ticket
+        """
+        bucket = self._buckets[service]
+        ordered = sorted(self._waiting[service], key=_Ticket.sort_key)
+        position = ordered.index(ticket) + 1
+        eta = bucket.time_until_available(now) + (position - 1) / bucket.rate
+        return position, eta
+
+    def _remove(self, service: str, ticket: _Ticket):
+        """
+        Take a ticket out of the queue; a session with nothing left queued loses
+        its fair-queuing tag, which no longer affects ordering once it is served
+        """
+        waiting = self._waiting[service]
+        waiting.remove(ticket)
+        if not any(other.session_id == ticket.session_id for other in waiting):
+            self._last_tag[service].pop(ticket.session_id, None)
+
+    def acquire(
+        self,
+        service: str,
+        session_id: str = "default",
+        priority: int = PRIORITY_INTERACTIVE,
+        wait_callback: Optional[WaitCallback] = None,
+    ) -> float:
+        """
+        Block until the service has quota for one call from this session
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        if service not in self._buckets:
+            raise KeyError(f"Unknown service: {service}")
+
+        started = time.monotonic()
+        with self._cond:
+            tags = self._last_tag[service]
+            tag = max(self._virtual_time[service], tags.get(session_id, 0)) + 1
+            tags[session_id] = tag
+            ticket = _Ticket(session_id, priority, tag, next(self._seq))
+            self._waiting[service].append(ticket)
+
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    head = min(self._waiting[service], key=_Ticket.sort_key)
+                    bucket = self._buckets[service]
+                    if head is ticket and bucket.time_until_available(now) <= 0:
+                        bucket.take(now)
+                        self._remove(service, ticket)
+                        self._virtual_time[service] = max(self._virtual_time[service], ticket.tag)
+                        self._cond.notify_all()
+                        return now - started
+                    position, eta = self._status(service, ticket, now)
+
+                if wait_callback:
+                    wait_callback(service, position, eta)
+
+                with self._cond:
+                    self._cond.wait(timeout=min(max(eta, 0.01), _POLL_INTERVAL))
+        except BaseException:
+            with self._cond:
+                if ticket in self._waiting[service]:
+                    self._remove(service, ticket)
+                    self._cond.notify_all()
+            raise
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Current queue length and available tokens per service
+        """
+        with self._cond:
+            now = time.monotonic()
+            result = {}
+            for name, bucket in self._buckets.items():
+                bucket._refill(now)
+                result[name] = {
+                    "queued": len(self._waiting[name]),
+                    "tokens": round(bucket.tokens, 1),
+                }
+            return result
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> QuotaScheduler:
+    """
+    Return the scheduler shared by every session in this process
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler(DEFAULT_LIMITS)
+        return _scheduler
+
+
+def reset_scheduler(limits: Optional[Dict[str, Tuple[float, int]]] = None) -> QuotaScheduler:
+    """
+    Replace the shared scheduler, e.g. with unthrottled limits when replaying recorded calls
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = QuotaScheduler(limits or DEFAULT_LIMITS)
+        return _scheduler
@@ -0,0 +1,101 @@
+"""
+Incremental Regeneration Module
+Fingerprints each speaker's inputs and plans which generations can be reused
+"""
+
+import hashlib
+import json
+from typing import Dict, List
+
+from prompts import EXTRACTION_PROMPT_VERSION, TEMPLATE_VERSION
+
+ACTION_REUSE = "reuse"
+ACTION_BOOKLET = "regenerate booklet"
+ACTION_FULL = "regenerate"
+
+# Gemini calls needed for each planned action
+ACTION_CALLS = {ACTION_REUSE: 0, ACTION_BOOKLET: 1, ACTION_FULL: 2}
+
+
+def new_cache() -> Dict[str, Dict]:
+    """
+    Empty cache of previous generations, keyed by fingerprint
+    """
+    return {"extractions": {}, "booklets": {}}
+
+
+def fingerprint(*parts) -> str:
+    """
+    Stable SHA-256 over JSON-serializable inputs
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extraction_fingerprint(details: Dict, transcript_hash: str) -> str:
+    """
+    Cache key of one speaker's transcript extraction
+    """
+    return fingerprint("extraction", EXTRACTION_PROMPT_VERSION, details, transcript_hash)
+
+
+def booklet_fingerprint(speaker: str, extraction_key: str, roster_key: str, it_date: str) -> str:
+    """
+    Cache key of one speaker's booklet; roster_key is fingerprint() of the whole roster
+    """
+    return fingerprint("booklet", TEMPLATE_VERSION, speaker, extraction_key, roster_key, it_date)
+
+
+def plan_regeneration(
+    speaker_rsvp_details: Dict[str, Dict],
+    transcript_hash: str,
+    it_date: str,
+    cache: Dict[str, Dict]
+) -> List[Dict]:
+    """
+    Decide per speaker whether to reuse, redo only the booklet, or redo both stages
+
+    The extraction depends on the speaker's RSVP record and the transcript.
+    The booklet additionally depends on the whole attendee roster, the event
+    date and the booklet template version.
+
+    Returns:
+        One plan entry per speaker (Host excluded) with its fingerprints and action
+    """
+    roster_key = fingerprint(speaker_rsvp_details)
+    plan = []
+
+    for speaker, details in speaker_rsvp_details.items():
+        if speaker == "Host":
+            continue
+
+        extraction_key = extraction_fingerprint(details, transcript_hash)
+        booklet_key = booklet_fingerprint(speaker, extraction_key, roster_key, it_date)
+
+        if booklet_key in cache["booklets"]:
+            action = ACTION_REUSE
+        elif extraction_key in cache["extractions"]:
+            action = ACTION_BOOKLET
+        else:
+            action = ACTION_FULL
+
+        plan.append({
+            "speaker": speaker,
+            "name": details.get("name", ""),
+            "action": action,
+            "extraction_key": extraction_key,
+            "booklet_key": booklet_key,
+        })
+
+    return plan
+
+
+def summarize_plan(plan: List[Dict]) -> Dict[str, int]:
+    """
+    Count of speakers per action plus the Gemini calls the plan will spend
+    """
+    summary = {ACTION_REUSE: 0, ACTION_BOOKLET: 0, ACTION_FULL: 0}
+    for entry in plan:
+        summary[entry["action"]] += 1
+    summary["gemini_calls"] = sum(ACTION_CALLS[entry["action"]] for entry in plan)
+    return summary
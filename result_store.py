@@ -0,0 +1,59 @@
+"""
+Booklet Result Store Module
+Structured per-speaker booklet records and their text exports
+"""
+
+import re
+from typing import Dict, List
+
+SEPARATOR = "\n" + "=" * 100 + "\n"
+
+
+def make_record(
+    speaker: str,
+    details: Dict,
+    booklet: str,
+    extract_seconds: float,
+    booklet_seconds: float,
+) -> Dict:
+    """
+    Build the stored record for one generated booklet
+    """
+    return {
+        "speaker": speaker,
+        "name": details.get("name", ""),
+        "company": details.get("company", ""),
+        "booklet": booklet,
+        "extract_seconds": round(extract_seconds, 2),
+        "booklet_seconds": round(booklet_seconds, 2),
+    }
+
+
+def record_label(record: Dict) -> str:
+    """
+    Human-readable label for page selectors and tabs
+    """
+    label = f"{record['speaker']}: {record['name']}"
+    if record.get("company"):
+        label += f" ({record['company']})"
+    return label
+
+
+def booklet_filename(record: Dict, prefix: str, extension: str = "txt") -> str:
+    """
+    Safe per-speaker file name, e.g. "11_19_Speaker_1_Jane_Doe.txt"
+    """
+    stem = f"{prefix}_{record['speaker']}_{record['name']}"
+    stem = re.sub(r"[^\w.-]+", "_", stem).strip("_")
+    return f"{stem}.{extension}"
+
+
+def combined_text(records: List[Dict]) -> str:
+    """
+    Join every booklet into the single document layout used for Google Docs
+    """
+    parts = []
+    for record in records:
+        parts.append(record["booklet"])
+        parts.append(SEPARATOR)
+    return "\n".join(parts)
@@ -0,0 +1,107 @@
+"""
+RSVP CSV Loader Module
+Column-projected, chunked CSV loading and vectorized speaker record building
+"""
+
+import pandas as pd
+from typing import BinaryIO, Dict, List, Optional
+
+# RSVP column -> key used in the speaker details sent to the prompts
+SPEAKER_FIELDS = {
+    "Company Name": "company",
+    "Industry": "industry",
+    "Role": "role",
+    "What their company solves.": "what_their_company_solves",
+    "What is the biggest challenge you are currently facing in your business?": "challenge",
+    "What is your superpower—the one thing you do exceptionally well that could help others?": "superpower",
+}
+
+REQUIRED_COLUMNS = ["First name", "Last name"] + list(SPEAKER_FIELDS)
+
+CHUNK_SIZE = 5000
+
+
+def read_csv_header(fileobj: BinaryIO) -> List[str]:
+    """
+    Read only the header row and rewind the file
+    """
+    fileobj.seek(0)
+    columns = pd.read_csv(fileobj, nrows=0).columns.tolist()
+    fileobj.seek(0)
+    return columns
+
+
+def list_event_values(fileobj: BinaryIO, event_column: str, chunksize: int = CHUNK_SIZE) -> List[str]:
+    """
+    Distinct values of the event column, reading just that one column
+    """
+    fileobj.seek(0)
+    values = set()
+    for chunk in pd.read_csv(fileobj, usecols=[event_column], dtype=str, keep_default_na=False, chunksize=chunksize):
+        values.update(chunk[event_column].unique())
+    fileobj.seek(0)
+    values.discard("")
+    return sorted(values)
+
+
+def load_rsvp_csv(
+    fileobj: BinaryIO,
+    event_column: Optional[str] = None,
+    event_value: Optional[str] = None,
+    chunksize: int = CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Load the required RSVP columns, optionally keeping only one event's rows
+
+    Args:
+        fileobj: Uploaded CSV file
+        event_column: Column identifying the event (None keeps every row)
+        event_value: Value of event_column to keep
+        chunksize: Rows per chunk, so large exports are filtered as they stream in
+
+    Returns:
+        DataFrame with exactly REQUIRED_COLUMNS as strings, NaN replaced by ""
+    """
+    filtering = event_column is not None and event_value is not None
+    usecols = REQUIRED_COLUMNS + ([event_column] if filtering and event_column not in REQUIRED_COLUMNS else [])
+
+    fileobj.seek(0)
+    frames = []
+    reader = pd.read_csv(fileobj, usecols=usecols, dtype=str, keep_default_na=False, chunksize=chunksize)
+    for chunk in reader:
+        if filtering:
+            chunk = chunk[chunk[event_column] == event_value]
+        frames.append(chunk[REQUIRED_COLUMNS])
+    fileobj.seek(0)
+
+    if not frames:
+        return pd.DataFrame(columns=REQUIRED_COLUMNS, dtype=str)
+    return pd.concat(frames, ignore_index=True).fillna("")
+
+
+def build_speaker_details(df: pd.DataFrame) -> Dict[str, Dict[str, str]]:
+    """
+    Build the "Speaker N" -> details mapping with column operations
+
+    Works for both CSV uploads and GHL-fetched DataFrames.
+    """
+    df = df[REQUIRED_COLUMNS].fillna("").astype(str).reset_index(drop=True)
+
+    details = df[list(SPEAKER_FIELDS)].rename(columns=SPEAKER_FIELDS)
+    details.insert(0, "name", df["First name"] + " " + df["Last name"])
+
+    keys = [f"Speaker {i + 1}" for i in range(len(details))]
+    return dict(zip(keys, details.to_dict("records")))
+
+
+def speaker_details_from_row(row: Dict[str, str]) -> Dict[str, str]:
+    """
+    Speaker details for a single RSVP/GHL record, for callers that stream records one at a time
+    """
+    def value(column):
+        item = row.get(column)
+        return "" if item is None or (isinstance(item, float) and pd.isna(item)) else str(item)
+
+    details = {"name": value("First name") + " " + value("Last name")}
+    details.update({key: value(column) for column, key in SPEAKER_FIELDS.items()})
+    return details
@@ -9,8 +9,28 @@ import sys
 import pandas as pd
 from google import genai
 import io
-from ghl_integration import GoHighLevelClient, fetch_participants_from_ghl, test_ghl_connection
+import time
+import uuid
+from cassette import record_meta
+from deferred_batch import (
+    BACKEND_GEMINI, STATUS_DONE, create_run, get_backend, key_fingerprint, list_runs, load_run,
+    merge_into_cache, resume_polling, run_records, start_polling,
+)
+from ghl_integration import GoHighLevelClient, fetch_participant, fetch_participants_from_ghl
 from google_docs_integration import create_google_doc
+from generation import get_client, build_roster, extract_speaker_transcript, generate_booklet_sections, render_sections
+from regeneration import (
+    ACTION_REUSE, ACTION_BOOKLET, booklet_fingerprint, extraction_fingerprint, fingerprint, new_cache,
+    plan_regeneration, summarize_plan,
+)
+from rsvp_loader import REQUIRED_COLUMNS, list_event_values, load_rsvp_csv, read_csv_header
+from local_export import EXPORT_FORMATS, MIME_TYPES, RENDERERS, build_export_zip
+from result_store import booklet_filename, combined_text, make_record, record_label
+from pipeline import StreamingPipeline
+from quota_scheduler import PRIORITY_INTERACTIVE, get_scheduler
+from transcript_ingest import SUPPORTED_EXTENSIONS, hash_text, hash_upload, parse_transcript, render_turns
+from transcript_normalize import NormalizeOptions, normalize_transcript
+from warmup import get_health, start_warm_up
 
 try:
     from dotenv import load_dotenv
@@ -25,32 +45,71 @@ if 'ghl_api_key' not in st.session_state:
     st.session_state.ghl_api_key = os.getenv("GHL_API_KEY", "")
 if 'ghl_location_id' not in st.session_state:
     st.session_state.ghl_location_id = os.getenv("GHL_LOCATION_ID", "")
-
-def process_innovators_table(transcripts, df, it_date, host_speaker):
-    """Main processing function that mirrors the original logic"""
+if 'transcript_store' not in st.session_state:
+    st.session_state.transcript_store = {}
+if 'generation_cache' not in st.session_state:
+    st.session_state.generation_cache = new_cache()
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'deferred_events' not in st.session_state:
+    st.session_state.deferred_events = []
+
+def queue_feedback(placeholder):
+    """Build a scheduler wait callback that reports queue position in a placeholder"""
+    def callback(service, position, eta):
+        placeholder.text(f"⏳ Waiting for {service} quota: position {position} in queue, ~{eta:.0f}s")
+    return callback
+
+def prepare_transcript(raw_hash, transcripts, options):
+    """Normalize the current transcript once per (content, options) and keep it in session state
+    
+    Returns:
+        Tuple of (content key, normalized text, cleanup stats)
+    """
+    key = fingerprint(raw_hash, list(options))
+    prepared = st.session_state.get('prepared_transcript')
+    if prepared is None or prepared[0] != key:
+        if raw_hash in st.session_state.transcript_store:
+            transcripts = render_turns(st.session_state.transcript_store[raw_hash])
+        text, stats = normalize_transcript(transcripts, options)
+        st.session_state.prepared_transcript = (key, text, stats)
+    return st.session_state.prepared_transcript
+
+# Uploaded CSVs are parsed once per (content hash, event selection); the
+# underscore-prefixed file argument is left out of the cache key
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_csv_header(csv_hash, _fileobj):
+    """Header row of an uploaded CSV"""
+    return read_csv_header(_fileobj)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_event_values(csv_hash, event_column, _fileobj):
+    """Distinct values of the event column of an uploaded CSV"""
+    return list_event_values(_fileobj, event_column)
+
+@st.cache_data(max_entries=16, show_spinner="Loading CSV...")
+def cached_rsvp_csv(csv_hash, event_column, event_value, _fileobj):
+    """RSVP rows of an uploaded CSV, filtered to one event if selected"""
+    return load_rsvp_csv(_fileobj, event_column, event_value)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_download(booklet, export_format):
+    """Download bytes for one booklet, rendered once per booklet text and format"""
+    return RENDERERS[export_format](booklet)
+
+def process_innovators_table(transcripts, df, it_date, host_speaker, transcript_hash, cache):
+    """Main processing function that mirrors the original logic
+    
+    Speakers whose fingerprinted inputs match a previous run reuse the cached
+    extraction and/or booklet from `cache` instead of calling Gemini again.
+    """
     
     # Initialize client with API key
-    client = genai.Client(api_key=st.session_state.api_key)
-    
-    speaker_rsvp_details = {}
-    for index, row in df.iterrows():
-        speaker_rsvp_details[f"Speaker {index + 1}"] = {
-            "name": row["First name"] + " " + row["Last name"],
-            "company": row["Company Name"],
-            "industry": row["Industry"],
-            "role": row["Role"],
-            "what_their_company_solves": row["What their company solves."],
-            "challenge": row["What is the biggest challenge you are currently facing in your business?"],
-            "superpower": row["What is your superpower—the one thing you do exceptionally well that could help others?"],
-        }
-
-    speaker_rsvp_details["Host"] = {
-        "name": "Dalton Locke",
-        "company": "MIT-45, PONO.AI, Spiritual Capitalist, Innovators Table",
-        "industry": "Other",
-        "role": "Owner/CEO",
-        "superpower": "Helping business owners solve their biggest challenges.",
-    }
+    client = get_client(st.session_state.api_key)
+    session_id = st.session_state.session_id
+    
+    speaker_rsvp_details = build_roster(df)
+    record_meta("generation", {"transcripts": transcripts, "rows": df.to_dict("records"), "it_date": it_date})
 
     # Display speaker details
     st.subheader("Identified Speakers:")
@@ -58,236 +117,191 @@ def process_innovators_table(transcripts, df, it_date, host_speaker):
         st.write(f"**{speaker}**: {speaker_rsvp_details[speaker]['name']}")
 
     # Process each speaker
-    all_booklets = []
+    records = []
     progress_bar = st.progress(0)
     status_text = st.empty()
+    queue_text = st.empty()
+    queue_wait = queue_feedback(queue_text)
     
-    speakers_to_process = [s for s in speaker_rsvp_details if s != "Host"]
-    total_speakers = len(speakers_to_process)
+    plan = plan_regeneration(speaker_rsvp_details, transcript_hash, it_date, cache)
+    total_speakers = len(plan)
     
-    for idx, speaker in enumerate(speakers_to_process):
+    for idx, entry in enumerate(plan):
+        speaker = entry["speaker"]
         status_text.text(f"Processing {speaker}: {speaker_rsvp_details[speaker]['name']}...")
         
-        st.write(f"\n### Extracting speaker transcripts for {speaker}...")
+        if entry["action"] == ACTION_REUSE:
+            st.write(f"\n### Reusing the previous booklet for {speaker}")
+            records.append(cache["booklets"][entry["booklet_key"]])
+            progress_bar.progress((idx + 1) / total_speakers)
+            continue
+        
+        if entry["action"] == ACTION_BOOKLET:
+            st.write(f"\n### Reusing the previous transcript extraction for {speaker}")
+            speaker_transcripts = cache["extractions"][entry["extraction_key"]]
+            extract_seconds = 0.0
+        else:
+            st.write(f"\n### Extracting speaker transcripts for {speaker}...")
 
-        response = client.models.generate_content(
-            model="gemini-3-pro-preview",
-            contents=f"""You are given a meeting transcipts of an event called the Innovators Table and the event has 7-10 people, including a host. The main purpose of the meeting is that each attendee share their biggest business challenges and the entire table tries to solve that. The host facilitates the meeting and ensures that each attendee gets a chance to share their challenge.
-            
-            You are also given the RSVP details of a speaker and your task is to extract the speaker's transcript from the meeting transcripts. Usually, the flow of the meeting is that each attendee starts by intorducing themselves, they talk about their business and share their biggest challenges. And we are interested in extracting the exact transcripts where the target attendee talks about their business and their biggest challenges.
+            extract_started = time.perf_counter()
+            speaker_transcripts = extract_speaker_transcript(
+                client, speaker_rsvp_details[speaker], transcripts, session_id, queue_wait, PRIORITY_INTERACTIVE
+            )
+            extract_seconds = time.perf_counter() - extract_started
             
-            Target Attendee: {speaker_rsvp_details[speaker]}
+            if len(speaker_transcripts) < 20:
+                st.error(f"Speaker transcripts for {speaker} looks empty or too short.")
+                continue
             
-            Meeting Transcripts: {transcripts}""",
-        )
-
-        speaker_transcripts = ""
-        try:
-            speaker_transcripts = response.text
-        except Exception:
-            speaker_transcripts = json.dumps(response, default=str)
-        
-        if len(speaker_transcripts) < 20:
-            st.error(f"Speaker transcripts for {speaker} looks empty or too short.")
-            continue
+            cache["extractions"][entry["extraction_key"]] = speaker_transcripts
         
         st.write("Designing the follow-up booklet for the speaker...")
 
-        follow_up_prompt_template = """You are given a predefined output template, detailed speaker information, and a full transcript from a single speaker at a private founder dinner event. The event is an intimate Innovators Table gathering where 7–10 founders openly discuss their businesses and challenges. Your role is to transform this one speaker’s raw, messy spoken transcript into a clean, professional follow-up document that exactly matches the provided output format. You must stay strictly grounded in the information from the speaker details and transcript, without inventing or assuming anything. The purpose is to create a ready-to-send recap that clearly captures the speaker’s context, challenges, insights, and next steps in a structured, polished way.
-
-            Your goal is to generate a clear, actionable follow-up document based on:
-            1. A predefined OUTPUT FORMAT template.
-            2. Detailed SPEAKER DETAILS.
-            3. Raw SPEAKER TRANSCRIPTS from a meeting.
-
-            Task: Carefully read all three sections below, then produce a polished follow-up document that strictly follows the OUTPUT FORMAT structure and uses only information grounded in the speaker details and transcripts.
-
-            Document Generation rules:
-            - No emojis
-            - No long dashes (indicating AI-generated document)
-            - No tables, use bulleted list instead
-
-            You will receive input in this structure:
-
-            OUTPUT FORMAT:
-
-            [Month Year] | Confidential Strategic Document
-            [Company Name] - Innovators Table Strategic Brief
-
-            What Happened at Your Table
-            On [IT_Date], you sat with [Number_of_people] entrepreneurs at the Innovators Table. Over 3 hours, we explored real challenges, shared hard-won insights, and created actionable pathways forward. This brief captures what matters most for YOUR business—the insights, connections, and immediate actions that can create momentum in the next 14 days.
-
-            Why This Matters Now:
-            [1-2 sentences about urgency/timing for their specific situation]
-
-            YOUR 5-MINUTE WIN (Do This Right Now):
-            [One tiny action they can complete immediately - e.g., "Text [Name] right now: 'Great meeting you at the table. Coffee this week?'" or "Block 30 minutes on your calendar for Action #1"]
-
-            Why this matters: Momentum starts with the first step, no matter how small.
-
-            Your Situation: What We Heard
-            Company: [Company Name]
-            Industry: [Industry]
-            Current Revenue: [Revenue range]
-            Team Size: [Number]
-            Time in Business: [Duration]
-            Your Primary Challenge:
-            [One paragraph summary of their main problem stated at table]
-            Quote from You:
-            "[Direct quote from transcript that captures their situation]"
-
-            What We Observed:
-            [Observation 1 about their business/situation]
-            [Observation 2 about their business/situation]
-            [Observation 3 about their business/situation]
-
-            Key Insights from the Table
-            These are the most valuable insights specifically for your situation:
-            Insight #1: [Main Insight]
-            [2-3 sentences explaining the insight and why it matters for them]
-            Insight #2: [Second Insight]
-            [2-3 sentences explaining the insight and why it matters for them]
-            Insight #3: [Third Insight]
-            [2-3 sentences explaining the insight and why it matters for them]
-
-            Resources Mentioned:
-            [Book/Tool/Contact mentioned at table]
-            [Book/Tool/Contact mentioned at table]
-            [Book/Tool/Contact mentioned at table]
-
-            Your 7-Day Action Plan
-            These three actions will create the most momentum for your business this week:
-            Action #1: [Specific Action]
-            Why: [Why this matters]
-            How: [Specific steps to take]
-            Deadline: [Day/Date]
-            Action #2: [Specific Action]
-            Why: [Why this matters]
-            How: [Specific steps to take]
-            Deadline: [Day/Date]
-            Action #3: [Specific Action]
-            Why: [Why this matters]
-            How: [Specific steps to take]
-            Deadline: [Day/Date]
-
-            Success Tracker (Check Off as You Complete):
-            ☐ Action #1 completed by [Date]
-            ☐ Action #2 completed by [Date]
-            ☐ Action #3 completed by [Date]
-            ☐ Connected with [Name 1]
-            ☐ Connected with [Name 2]
-            ☐ Progress email sent to request full Strategic Mirror Document
-
-            IF YOU ONLY DO ONE THING THIS WEEK:
-            [The single highest-impact action from your 3 actions above]
-            Do this, and everything else becomes easier.
-
-            Success Metrics (How to Know You're Winning):
-            Week 1: [Specific metric - e.g., "You've scheduled 2 key conversations"]
-            Week 2: [Specific metric - e.g., "You have clarity on your decision and next steps"]
-            30 Days: [Specific outcome - e.g., "Deal in progress OR revenue increased 15%"]
-
-            Connections to Make
-            People from the table who can help you:
-            [Name] - [Company]
-            Why connect: [Specific reason relevant to their business]
-            Suggested approach: [How to reach out]
-            [Name] - [Company]
-            Why connect: [Specific reason relevant to their business]
-            Suggested approach: [How to reach out]
-
-            What Others Are Saying
-            Previous Innovators Table attendees who implemented their action plans:
-
-            "It was a great experience! I feel lucky to be able to get to know so many amazing individuals. I’ve never had a discussion like that where business builders were just so open with each other and really listen and give advice that saved us a lot of time and money going down the wrong path."
-            Charlie Gomez, Founder and CEO at CG Trades
-
-            "This was single-handedly the most beneficial and rewarding professional meeting I’ve had in years. And it didn’t even end up just being about work, it centered on how I can be a better person. I loved the experience! The other people in the room had incredibly insightful feedback for me."
-            Chase Huntzinger, CEO at Piton Ventures & CFO at Second Chair AI
-
-            "The dinner meeting offered a great opportunity to exchange ideas, gain perspective from others in the field, and explore potential collaborations. It was both productive and enjoyable."
-            Jeremy L Christensen, Chairman/CEO at Euldora Financial
-
-
-            What's Next: Your Full Strategic Mirror Document
-            This brief gives you immediate actions for the next 14 days. But there's more.
-            Your Full Strategic Mirror Document includes:
-            Complete 30/60/90 day transformation roadmap
-            Detailed implementation frameworks and templates
-            Financial projections and models specific to your situation
-            Step-by-step playbooks for your biggest challenges
-            Complete resource guide with all connections and tools
-            Strategic analysis of your competitive position
-            The full document is typically 15-20 pages of customized strategy.
-
-            To receive your complete Strategic Mirror Document:
-            Implement the 7-day action plan above
-            Email your progress update to: dalton@theinnovatorstable.com
-            The full document is reserved for those who take action. Complete your 7-day plan, and we'll send you the complete strategic roadmap.
-
-            Stuck or Have Questions? Reach out:
-            Email: dalton@theinnovatorstable.com
-            Text: +1 (801) 555-0123 (yes, really)
-            We want you to succeed. If you hit a wall, ask for help.
-
-            We would love to hear about:
-            What you implemented from this brief
-            Results you achieved
-            Your next biggest challenge
-
-            The table is watching. Make us proud.
-
-            Document prepared for: [Name]
-            Innovators Table | [Month Year]
-
-
-            SPEAKER DETAILS:
-            <<speaker_details>>
-
-            OTHER ATTENDEES ON THE TABLE:
-            <<other_attendees>>
-
-            SPEAKER TRANSCRIPTS:
-            <<speaker_transcripts>>"""
-
-        follow_up_prompt = follow_up_prompt_template.replace("<<speaker_details>>", json.dumps(speaker_rsvp_details[speaker], indent=2, ensure_ascii=False))
-        follow_up_prompt = follow_up_prompt.replace("<<speaker_transcripts>>", speaker_transcripts)
-        follow_up_prompt = follow_up_prompt.replace("<<other_attendees>>", json.dumps({k:v for k, v in speaker_rsvp_details.items() if k!=speaker}, indent=2, ensure_ascii=False))
-        follow_up_prompt = follow_up_prompt.replace("[IT_Date]", f"{it_date}_2025")
-        follow_up_prompt = follow_up_prompt.replace("[Number_of_people]", str(len(speaker_rsvp_details)))
-        follow_up_prompt = follow_up_prompt.replace("[Month Year]", "November 2025")
-
-        response = client.models.generate_content(
-            model="gemini-3-pro-preview",
-            contents=follow_up_prompt,
+        booklet_started = time.perf_counter()
+        sections, failed = generate_booklet_sections(
+            client, speaker, speaker_rsvp_details, speaker_transcripts, it_date, session_id, queue_wait,
+            on_repair=lambda failed: st.write(f"Repairing sections: {', '.join(failed)}..."),
+            priority=PRIORITY_INTERACTIVE
         )
-
-        follow_up_booklet = ""
-        try:
-            follow_up_booklet = response.text
-        except Exception:
-            follow_up_booklet = json.dumps(response, default=str)
+        booklet_seconds = time.perf_counter() - booklet_started
         
-        if len(follow_up_booklet) < 20:
-            st.error(f"Follow Up Booklet for {speaker} looks empty or too short.")
+        if failed:
+            st.error(f"Follow Up Booklet for {speaker} is missing sections: {', '.join(failed)}")
             continue
         
-        all_booklets.append(follow_up_booklet)
-        all_booklets.append("\n" + "="*100 + "\n")
+        follow_up_booklet = render_sections(sections, speaker_rsvp_details, it_date)
+        
+        record = make_record(
+            speaker, speaker_rsvp_details[speaker], follow_up_booklet, extract_seconds, booklet_seconds
+        )
+        cache["booklets"][entry["booklet_key"]] = record
+        records.append(record)
         
         # Update progress
         progress_bar.progress((idx + 1) / total_speakers)
     
     status_text.text("Processing complete!")
+    queue_text.empty()
+    
+    return records
+
+def run_streaming_pipeline(transcripts, identifiers, it_date, export_docs, transcript_hash, cache):
+    """Fetch, generate and export participant by participant instead of phase by phase
+    
+    Extractions and booklets are looked up in and stored to `cache` with the same
+    fingerprints as process_innovators_table. The workers get the dict itself,
+    since session state is not available on their threads.
+    """
+    
+    client = get_client(st.session_state.api_key)
+    session_id = st.session_state.session_id
+    ghl_client = GoHighLevelClient(
+        st.session_state.ghl_api_key, st.session_state.ghl_location_id, session_id, PRIORITY_INTERACTIVE
+    )
+    record_meta("streaming", {
+        "location_id": st.session_state.ghl_location_id,
+        "identifiers": identifiers,
+        "transcripts": transcripts,
+        "it_date": it_date,
+    })
+    field_map = ghl_client.get_custom_fields_map()
+    rows = []
+    
+    def fetch(email, wait_callback):
+        ghl_client.wait_callback = wait_callback
+        row = fetch_participant(ghl_client, email, field_map)
+        if row is not None:
+            rows.append(row)
+        return row
+    
+    def extract(details, wait_callback):
+        key = extraction_fingerprint(details, transcript_hash)
+        if key in cache["extractions"]:
+            return cache["extractions"][key]
+        speaker_transcripts = extract_speaker_transcript(
+            client, details, transcripts, session_id, wait_callback, PRIORITY_INTERACTIVE
+        )
+        if len(speaker_transcripts) >= 20:
+            cache["extractions"][key] = speaker_transcripts
+        return speaker_transcripts
+    
+    def booklet(speaker, roster, speaker_transcripts, extract_seconds, wait_callback):
+        # The roster is complete once booklets start, so the key matches the planned one
+        key = booklet_fingerprint(
+            speaker, extraction_fingerprint(roster[speaker], transcript_hash), fingerprint(roster), it_date
+        )
+        if key in cache["booklets"]:
+            return cache["booklets"][key]
+        started = time.perf_counter()
+        sections, failed = generate_booklet_sections(
+            client, speaker, roster, speaker_transcripts, it_date, session_id, wait_callback,
+            priority=PRIORITY_INTERACTIVE
+        )
+        if failed:
+            raise ValueError(f"Booklet is missing sections: {', '.join(failed)}")
+        record = make_record(
+            speaker, roster[speaker], render_sections(sections, roster, it_date),
+            extract_seconds, time.perf_counter() - started
+        )
+        cache["booklets"][key] = record
+        return record
+    
+    def export(record):
+        return create_google_doc(f"{it_date} - {record['name']}", record["booklet"])
     
-    return "\n".join(all_booklets)
+    pipeline = StreamingPipeline(fetch, extract, booklet, export if export_docs else None)
+    
+    status_text = st.empty()
+    queue_text = st.empty()
+    log_container = st.expander("📋 Pipeline Log", expanded=True)
+    records = []
+    
+    # Stop the pipeline workers if this script run is interrupted (rerun or stop)
+    try:
+        for event in pipeline.run(identifiers):
+            kind = event[0]
+            if kind == "queue":
+                _, stage, service, position, eta = event
+                queue_text.text(f"⏳ {stage}: waiting for {service} quota, position {position}, ~{eta:.0f}s")
+                continue
+        
+            with log_container:
+                if kind == "fetched":
+                    st.text(f"✅ Fetched {event[1]}: {event[2]}")
+                elif kind == "not_found":
+                    st.text(f"❌ Not found: {event[1]}")
+                elif kind == "extracted":
+                    st.text(f"📝 Extracted transcript for {event[1]}")
+                elif kind == "booklet":
+                    records.append(event[1])
+                    st.text(f"📘 Booklet ready for {record_label(event[1])}")
+                elif kind == "exported":
+                    record, response = event[1], event[2]
+                    if response['success']:
+                        st.markdown(f"📄 [{record['name']}]({response['document_url']})")
+                    else:
+                        st.text(f"⚠️ Export failed for {record['name']}: {response['message']}")
+                elif kind == "error":
+                    st.error(f"{event[1]} failed for {event[2]}: {event[3]}")
+        
+            status_text.text(f"Booklets ready: {len(records)}")
+    finally:
+        pipeline.stop()
+    
+    queue_text.empty()
+    st.dataframe(pd.DataFrame(pipeline.stage_stats()), hide_index=True, use_container_width=True)
+    
+    if rows:
+        st.session_state['fetched_df'] = pd.DataFrame(rows)
+    records.sort(key=lambda record: int(record["speaker"].split()[-1]))
+    return records
 
 def main():
     st.set_page_config(page_title="Innovators Table Follow-up Generator", layout="wide")
 
     # Initialize session state for result
-    if 'generated_result' not in st.session_state:
-        st.session_state.generated_result = None
+    if 'generated_results' not in st.session_state:
+        st.session_state.generated_results = []
     if 'result_filename' not in st.session_state:
         st.session_state.result_filename = None
     
@@ -329,16 +343,34 @@ def main():
         if ghl_location_id:
             st.session_state.ghl_location_id = ghl_location_id
         
-        # Test GHL connection
-        if st.button("🔍 Test GHL Connection"):
-            if st.session_state.ghl_api_key and st.session_state.ghl_location_id:
-                with st.spinner("Testing connection..."):
-                    if test_ghl_connection(st.session_state.ghl_api_key, st.session_state.ghl_location_id):
-                        st.success("✅ GHL Connected!")
-                    else:
-                        st.error("❌ Connection Failed")
+        # Connections (GHL included) are warmed up once per process in the background and cached
+        force_check = st.button("🔄 Re-check Connections")
+        health_key = start_warm_up(
+            st.session_state.api_key,
+            st.session_state.ghl_api_key,
+            st.session_state.ghl_location_id,
+            force=force_check
+        )
+        for name, result in get_health(health_key).items():
+            if result is None:
+                st.caption(f"⏳ {name}: warming up...")
+            elif result["ok"]:
+                st.caption(f"✅ {name}: {result['latency_ms']} ms")
             else:
-                st.warning("Please enter both API Key and Location ID")
+                st.caption(f"❌ {name}: {result['message']} ({result['latency_ms']} ms)")
+        
+        # Deferred runs left unfinished by a previous process resume polling once their key is available
+        if st.session_state.api_key:
+            api_key = st.session_state.api_key
+            resume_polling(key_fingerprint(api_key), lambda name: get_backend(api_key, name))
+        
+        # Shared quota status across all sessions in this process
+        quota = get_scheduler().snapshot()
+        st.caption(
+            "Quota queue: " + ", ".join(
+                f"{name} {info['queued']} waiting / {info['tokens']} tokens" for name, info in quota.items()
+            )
+        )
         
         st.markdown("---")
         
@@ -354,6 +386,7 @@ def main():
     tab1, tab2 = st.tabs(["📊 Upload CSV", "🔗 Fetch from GoHighLevel"])
     
     df = None
+    identifiers_text = ""
     
     with tab1:
         st.header("📊 Upload RSVP CSV")
@@ -365,24 +398,34 @@ def main():
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                st.success(f"✅ CSV uploaded successfully! Found {len(df)} attendees.")
-                
-                with st.expander("Preview CSV Data"):
-                    st.dataframe(df.head())
-                    
-                required_columns = [
-                    "First name", "Last name", "Company Name", "Industry", 
-                    "Role", "What their company solves.",
-                    "What is the biggest challenge you are currently facing in your business?",
-                    "What is your superpower—the one thing you do exceptionally well that could help others?"
-                ]
-                missing_columns = [col for col in required_columns if col not in df.columns]
+                csv_hash = hash_upload(uploaded_file)
+                columns = cached_csv_header(csv_hash, uploaded_file)
+                missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
                 
                 if missing_columns:
                     st.error(f"❌ Missing required columns: {', '.join(missing_columns)}")
-                    st.info("Available columns: " + ", ".join(df.columns.tolist()))
-                    df = None
+                    st.info("Available columns: " + ", ".join(columns))
+                else:
+                    # Optionally keep only one event's rows from a multi-event export
+                    event_column = st.selectbox(
+                        "Event column",
+                        ["(all rows)"] + [col for col in columns if col not in REQUIRED_COLUMNS],
+                        help="Column identifying the event, for CRM exports covering several events"
+                    )
+                    event_value = None
+                    if event_column == "(all rows)":
+                        event_column = None
+                    else:
+                        event_value = st.selectbox(
+                            "Event",
+                            cached_event_values(csv_hash, event_column, uploaded_file)
+                        )
+                    
+                    df = cached_rsvp_csv(csv_hash, event_column, event_value, uploaded_file)
+                    st.success(f"✅ CSV uploaded successfully! Found {len(df)} attendees.")
+                    
+                    with st.expander("Preview CSV Data"):
+                        st.dataframe(df.head())
                     
             except Exception as e:
                 st.error(f"❌ Error reading CSV: {str(e)}")
@@ -432,12 +475,18 @@ def main():
                             progress_bar.progress(value)
                         
                         status_text.text(f"Fetching {len(identifiers)} participants from GoHighLevel...")
+                        record_meta("ghl_fetch", {
+                            "location_id": st.session_state.ghl_location_id,
+                            "identifiers": identifiers,
+                        })
                         
                         df, messages = fetch_participants_from_ghl(
                             st.session_state.ghl_api_key,
                             st.session_state.ghl_location_id,
                             identifiers,
-                            progress_callback=update_progress
+                            progress_callback=update_progress,
+                            session_id=st.session_state.session_id,
+                            wait_callback=queue_feedback(status_text)
                         )
                         
                         # Display log messages
@@ -470,12 +519,40 @@ def main():
     # Transcripts section (common to both tabs)
     st.markdown("---")
     st.header("📝 Meeting Transcripts")
-    transcripts = st.text_area(
-        "Paste the meeting transcripts here",
-        height=300,
-        help="Paste the full transcript of the Innovators Table meeting"
+    transcript_file = st.file_uploader(
+        "Upload a transcript file",
+        type=SUPPORTED_EXTENSIONS,
+        help="VTT, SRT, plain text or DOCX export of the meeting recording"
     )
     
+    transcript_hash = None
+    if transcript_file is not None:
+        try:
+            transcript_hash = hash_upload(transcript_file)
+            # Parse each distinct upload once per session, keyed by content hash
+            if transcript_hash not in st.session_state.transcript_store:
+                with st.spinner("Parsing transcript..."):
+                    st.session_state.transcript_store[transcript_hash] = parse_transcript(
+                        transcript_file, transcript_file.name
+                    )
+            turns = st.session_state.transcript_store[transcript_hash]
+            speakers = sorted({turn.speaker for turn in turns})
+            st.info(f"📊 Parsed {len(turns)} turns from {len(speakers)} speakers: {', '.join(speakers)}")
+            
+            with st.expander("Preview Transcript"):
+                st.text(render_turns(turns[:20]))
+        except Exception as e:
+            st.error(f"❌ Error reading transcript: {str(e)}")
+            transcript_hash = None
+    
+    transcripts = ""
+    if transcript_hash is None:
+        transcripts = st.text_area(
+            "Or paste the meeting transcripts here",
+            height=300,
+            help="Paste the full transcript of the Innovators Table meeting"
+        )
+    
     if transcripts:
         word_count = len(transcripts.split())
         st.info(f"📊 Transcript length: {len(transcripts)} characters, ~{word_count} words")
@@ -483,6 +560,48 @@ def main():
         if len(transcripts) < 20:
             st.warning("⚠️ Transcript seems too short. Please ensure you've pasted the complete transcript.")
     
+    # Local cleanup so timestamps, filler and noise are not sent once per speaker
+    with st.expander("🧹 Transcript Cleanup"):
+        normalize_options = NormalizeOptions(
+            strip_timestamps=st.checkbox("Strip timestamps", value=True),
+            remove_fillers=st.checkbox("Remove filler words (um, uh, you know, ...)", value=True),
+            remove_noise=st.checkbox("Remove noise tags ([inaudible], [crosstalk], ...)", value=True),
+            merge_turns=st.checkbox("Merge consecutive turns from the same speaker", value=True),
+            collapse_whitespace=st.checkbox("Collapse whitespace", value=True),
+        )
+    
+    content_hash = None
+    raw_hash = transcript_hash or (hash_text(transcripts) if transcripts else None)
+    if raw_hash:
+        content_hash, transcripts, cleanup_stats = prepare_transcript(raw_hash, transcripts, normalize_options)
+        saved = cleanup_stats["tokens_before"] - cleanup_stats["tokens_after"]
+        st.caption(
+            f"🧹 Cleanup: ~{cleanup_stats['tokens_before']} → ~{cleanup_stats['tokens_after']} tokens "
+            f"per prompt ({saved * 100 // max(cleanup_stats['tokens_before'], 1)}% saved)"
+        )
+    
+    # Regeneration plan preview, shown before any quota is spent
+    plan_df = st.session_state.get('fetched_df')
+    if plan_df is None:
+        plan_df = df
+    
+    if plan_df is not None and len(plan_df) > 0 and content_hash:
+        plan = plan_regeneration(
+            build_roster(plan_df), content_hash, it_date, st.session_state.generation_cache
+        )
+        summary = summarize_plan(plan)
+        with st.expander("🧮 Regeneration Plan", expanded=summary[ACTION_REUSE] + summary[ACTION_BOOKLET] > 0):
+            st.info(
+                f"{summary['gemini_calls']} Gemini calls: "
+                f"{summary[ACTION_REUSE]} reused, {summary[ACTION_BOOKLET]} booklet only, "
+                f"{len(plan) - summary[ACTION_REUSE] - summary[ACTION_BOOKLET]} fully regenerated"
+            )
+            st.dataframe(
+                pd.DataFrame(plan)[["speaker", "name", "action"]],
+                hide_index=True,
+                use_container_width=True
+            )
+    
     # Process button
     st.markdown("---")
     
@@ -499,15 +618,18 @@ def main():
                 df = None
             
             if df is not None and (not transcripts or len(transcripts) < 20):
-                st.error("❌ Please paste the meeting transcripts.")
+                st.error("❌ Please upload or paste the meeting transcripts.")
             elif df is not None:
                 # Process
                 try:
                     with st.spinner("🔄 Processing... This may take several minutes."):
-                        result = process_innovators_table(transcripts, df, it_date, host_speaker)
+                        result = process_innovators_table(
+                            transcripts, df, it_date, host_speaker,
+                            content_hash, st.session_state.generation_cache
+                        )
                     
                     # Store result in session state
-                    st.session_state.generated_result = result
+                    st.session_state.generated_results = result
                     st.session_state.result_filename = f"{it_date}_follow_up_booklets"
                     
                     st.success("✅ Follow-up booklets generated successfully!")
@@ -516,36 +638,149 @@ def main():
                     st.error(f"❌ Error during processing: {str(e)}")
                     st.exception(e)
 
+    # Deferred alternative: non-urgent events are submitted as bulk batch jobs and polled in the background
+    with st.expander("🕒 Deferred Batch Run"):
+        st.caption(
+            "Packs every extraction and booklet request for one or more events into bulk jobs "
+            "at batch pricing. Jobs are polled in the background, so results may take hours."
+        )
+        col_add, col_submit = st.columns(2)
+        with col_add:
+            if st.button("➕ Add This Event to the Batch", use_container_width=True):
+                event_df = st.session_state.get('fetched_df')
+                if event_df is None:
+                    event_df = df
+                if event_df is None or len(event_df) == 0:
+                    st.error("❌ Please upload a CSV or fetch participants from GoHighLevel.")
+                elif not transcripts or len(transcripts) < 20:
+                    st.error("❌ Please upload or paste the meeting transcripts.")
+                else:
+                    st.session_state.deferred_events.append({
+                        "it_date": it_date,
+                        "transcripts": transcripts,
+                        "transcript_hash": content_hash,
+                        "roster": build_roster(event_df),
+                    })
+        with col_submit:
+            if st.button(
+                "🕒 Submit Deferred Batch",
+                disabled=not st.session_state.deferred_events,
+                use_container_width=True
+            ):
+                if not st.session_state.api_key:
+                    st.error("❌ Please provide a Gemini API key in the sidebar.")
+                else:
+                    backend_name = os.getenv("DEFERRED_BACKEND", BACKEND_GEMINI)
+                    run = create_run(
+                        st.session_state.deferred_events, st.session_state.generation_cache, backend_name,
+                        key_fingerprint(st.session_state.api_key)
+                    )
+                    start_polling(run["run_id"], get_backend(st.session_state.api_key, backend_name))
+                    st.session_state.deferred_events = []
+                    st.success(f"✅ Submitted deferred run {run['run_id']}")
+        
+        if st.session_state.deferred_events:
+            st.info(
+                "Events waiting to be submitted: "
+                + ", ".join(event["it_date"] for event in st.session_state.deferred_events)
+            )
+        
+        for entry in list_runs()[:10]:
+            summary = entry["summary"]
+            st.markdown(
+                f"**{entry['run_id']}**: {entry['status']} ({entry['stage']}), "
+                f"{summary['completed']}/{summary['speakers']} booklets, {summary['events']} events. "
+                f"{entry['message']}"
+            )
+            for error in entry["errors"]:
+                st.caption(f"⚠️ {error}")
+            if entry["status"] == STATUS_DONE:
+                for event_id, event_date in entry["events"].items():
+                    if st.button(f"📥 Load {event_date} results", key=f"load_{entry['run_id']}_{event_id}"):
+                        run = load_run(entry["run_id"])
+                        st.session_state.generated_results = run_records(run, event_id)
+                        st.session_state.result_filename = f"{event_date}_follow_up_booklets"
+                        merge_into_cache(run, st.session_state.generation_cache)
+        st.button("🔄 Refresh Deferred Runs")
+    
+    # Streaming alternative: each participant flows from GHL to export on its own
+    if identifiers_text:
+        export_docs = st.checkbox("Export each booklet to Google Docs as soon as it is ready", value=False)
+        if st.button("⚡ Stream from GHL: Fetch, Generate and Export", use_container_width=True):
+            if not st.session_state.api_key:
+                st.error("❌ Please provide a Gemini API key in the sidebar.")
+            elif not transcripts or len(transcripts) < 20:
+                st.error("❌ Please upload or paste the meeting transcripts.")
+            else:
+                identifiers = [line.strip() for line in identifiers_text.split("\n") if line.strip()]
+                try:
+                    st.session_state.generated_results = run_streaming_pipeline(
+                        transcripts, identifiers, it_date, export_docs,
+                        content_hash, st.session_state.generation_cache
+                    )
+                    st.session_state.result_filename = f"{it_date}_follow_up_booklets"
+                except Exception as e:
+                    st.error(f"❌ Error during processing: {str(e)}")
+                    st.exception(e)
+    
     # Display results if available (outside the button click)
-    if st.session_state.generated_result:
-        # Display result
+    if st.session_state.generated_results:
+        records = st.session_state.generated_results
+        
+        # Render one booklet per page so reruns only ship the selected speaker
         with st.expander("📄 View Generated Booklets", expanded=True):
+            page = st.selectbox(
+                "Speaker",
+                range(len(records)),
+                format_func=lambda i: record_label(records[i]),
+                key="result_page"
+            )
+            record = records[page]
+            st.caption(
+                f"Extraction {record['extract_seconds']}s, booklet {record['booklet_seconds']}s"
+            )
             st.text_area(
                 "Generated Content", 
-                value=st.session_state.generated_result, 
+                value=record["booklet"], 
                 height=400,
-                key="result_display"
+                key=f"result_display_{page}"
             )
         
-        # Create two columns for buttons
-        col1, col2 = st.columns(2)
+        # Local exports are rendered in memory, no network round trips
+        export_format = st.radio("Download format", EXPORT_FORMATS, horizontal=True, key="export_format")
+        
+        # Create three columns for buttons
+        col1, col2, col3 = st.columns(3)
         
-        # Download button
+        # Per-speaker download
         with col1:
             st.download_button(
-                label="💾 Download Follow-up Booklets",
-                data=st.session_state.generated_result,
-                file_name=f"{st.session_state.result_filename}.txt",
-                mime="text/plain",
+                label="💾 Download This Booklet",
+                data=render_download(record["booklet"], export_format),
+                file_name=booklet_filename(record, st.session_state.result_filename, export_format),
+                mime=MIME_TYPES[export_format],
                 use_container_width=True
             )
         
-        # Google Docs button
+        # ZIP of every booklet, only built when requested
         with col2:
+            if st.button("🗜️ Prepare ZIP of All Booklets", use_container_width=True, key="zip_button"):
+                with st.spinner("Rendering booklets..."):
+                    zip_data = build_export_zip(records, st.session_state.result_filename, [export_format])
+                st.download_button(
+                    label="💾 Download ZIP",
+                    data=zip_data,
+                    file_name=f"{st.session_state.result_filename}_{export_format}.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
+        
+        # Google Docs button
+        with col3:
             if st.button("📝 Send to Google Docs", use_container_width=True, key="gdocs_button"):
                 with st.spinner("Creating Google Doc..."):
                     doc_title = f"{st.session_state.result_filename}"
-                    response = create_google_doc(doc_title, st.session_state.generated_result)
+                    response = create_google_doc(doc_title, combined_text(records))
                     
                     if response['success']:
                         st.success(response['message'])
@@ -0,0 +1,132 @@
+"""
+Deferred Batch Tests
+Drives runs end to end through the local file-based backend
+"""
+
+import json
+
+import pytest
+
+import deferred_batch
+from booklet_schema import SECTION_SCHEMAS
+from deferred_batch import (
+    MAX_AUTH_FAILURES, STAGE_BOOKLET, STAGE_EXTRACT, STAGE_REPAIR, STATUS_DONE, STATUS_FAILED,
+    BatchBackend, LocalFileBatchBackend, advance, create_run, list_runs, load_run, merge_into_cache,
+    resume_polling, run_records,
+)
+from regeneration import new_cache
+
+ROSTER = {
+    "Speaker 1": {"name": "Jane Doe", "company": "Acme"},
+    "Speaker 2": {"name": "Bob Smith", "company": "Bakery"},
+    "Host": {"name": "Host", "company": "Innovators Table"},
+}
+
+
+def _sample(schema):
+    if schema["type"] == "OBJECT":
+        return {name: _sample(child) for name, child in schema["properties"].items()}
+    if schema["type"] == "ARRAY":
+        return [_sample(schema["items"]) for _ in range(3)]
+    return "A specific, filled-in value"
+
+
+SECTIONS = {name: _sample(schema) for name, schema in SECTION_SCHEMAS.items()}
+
+
+def responder(request):
+    """Answers like Gemini, but leaves out one section of every first booklet attempt"""
+    config = request.get("generation_config")
+    if not config:
+        return "Jane: We are growing fast and need help hiring our first manager."
+    names = list(config["response_schema"]["properties"])
+    answer = {name: SECTIONS[name] for name in names}
+    if len(names) == len(SECTIONS):
+        answer.pop(names[0])
+    return json.dumps(answer)
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(deferred_batch, "RUNS_DIR", str(tmp_path))
+    return LocalFileBatchBackend(responder, directory=str(tmp_path / "jobs"))
+
+
+def _event(it_date="11_19"):
+    return {"it_date": it_date, "transcripts": "Jane: ... Bob: ...", "transcript_hash": "abc", "roster": ROSTER}
+
+
+def test_run_goes_through_extract_booklet_repair(backend):
+    run = create_run([_event("11_19"), _event("12_03")])
+
+    stages = []
+    while run["status"] != STATUS_DONE:
+        run = advance(run, backend)
+        stages.extend(job["stage"] for job in run["jobs"][len(stages):])
+
+    assert stages == [STAGE_EXTRACT, STAGE_BOOKLET, STAGE_REPAIR]
+    assert [job["requests"] for job in run["jobs"]] == [4, 4, 4]
+    records = run_records(run, "1-11_19")
+    assert [record["speaker"] for record in records] == ["Speaker 1", "Speaker 2"]
+    assert all(item["sections"] == SECTIONS for item in run["items"].values())
+    assert all("sections" not in record for record in records)
+    assert list_runs()[0]["summary"]["completed"] == 4
+
+
+def test_cached_results_are_not_resubmitted(backend):
+    run = create_run([_event()])
+    while run["status"] != STATUS_DONE:
+        run = advance(run, backend)
+    cache = new_cache()
+    merge_into_cache(run, cache)
+
+    rerun = advance(create_run([_event()], cache), backend)
+
+    assert rerun["status"] == STATUS_DONE
+    assert rerun["jobs"] == []
+    assert run_records(rerun, "1-11_19") == run_records(run, "1-11_19")
+
+
+class AuthError(Exception):
+    code = 403
+
+
+class RefusingBackend(BatchBackend):
+    """Backend for a key that does not own the run's jobs"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, path, display_name):
+        self.calls += 1
+        raise AuthError("Permission denied")
+
+    def status(self, job_id):
+        raise AuthError("Permission denied")
+
+    def results(self, job_id):
+        raise AuthError("Permission denied")
+
+
+def test_polling_stops_after_repeated_auth_errors(backend):
+    run = create_run([_event()], key_id="other")
+    refusing = RefusingBackend()
+
+    deferred_batch._poll(run["run_id"], refusing, interval=0)
+
+    run = load_run(run["run_id"])
+    assert refusing.calls == MAX_AUTH_FAILURES
+    assert run["status"] == STATUS_FAILED
+    assert "auth errors" in run["message"]
+
+
+def test_resume_only_polls_runs_of_the_same_key(backend, monkeypatch):
+    monkeypatch.setattr(deferred_batch, "_resumed_keys", set())
+    started = []
+    monkeypatch.setattr(deferred_batch, "start_polling", lambda run_id, _backend: started.append(run_id) or True)
+    mine = create_run([_event()], key_id="mine")
+    create_run([_event()], key_id="other")
+
+    assert resume_polling("mine", lambda name: backend) == 1
+    assert resume_polling("mine", lambda name: backend) == 0
+    assert started == [mine["run_id"]]
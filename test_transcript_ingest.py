@@ -0,0 +1,85 @@
+"""
+Transcript Ingestion Tests
+"""
+
+import io
+import zipfile
+
+from transcript_ingest import Turn, parse_transcript
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    "{}</w:body></w:document>"
+)
+
+
+def parse(text: str, filename: str):
+    return parse_transcript(io.BytesIO(text.encode("utf-8")), filename)
+
+
+def make_docx(paragraphs):
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML.format(body))
+    buffer.seek(0)
+    return buffer
+
+
+def test_vtt_voice_tags():
+    vtt = (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:04.000\n<v Alice>The plan is: ship it\n\n"
+        "00:00:04.000 --> 00:00:06.000\n<v Alice>Step 1: write the docs\n\n"
+        "00:00:06.000 --> 00:00:08.000\n<v Bob Smith>Sounds good\n"
+    )
+    assert parse(vtt, "call.vtt") == [
+        Turn("Alice", 1.0, 6.0, "The plan is: ship it Step 1: write the docs"),
+        Turn("Bob Smith", 6.0, 8.0, "Sounds good"),
+    ]
+
+
+def test_vtt_prefix_only_on_first_cue_line():
+    vtt = (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:03.000\nAlice: We grew fast\nNote: mostly in Q3\n\n"
+        "00:00:03.000 --> 00:00:05.000\nThe plan is: ship it\n\n"
+        "00:00:05.000 --> 00:00:07.000\nBob: Great\n"
+    )
+    assert parse(vtt, "call.vtt") == [
+        Turn("Alice", 1.0, 5.0, "We grew fast Note: mostly in Q3 The plan is: ship it"),
+        Turn("Bob", 5.0, 7.0, "Great"),
+    ]
+
+
+def test_srt_cues():
+    srt = (
+        "1\n00:00:01,000 --> 00:00:02,500\nSpeaker 1: Hello there\n\n"
+        "2\n00:00:02,500 --> 00:00:04,000\nStep 1: register the domain\n\n"
+        "3\n00:00:04,000 --> 00:00:05,000\nSpeaker 2: Hi\n"
+    )
+    assert parse(srt, "call.srt") == [
+        Turn("Speaker 1", 1.0, 4.0, "Hello there Step 1: register the domain"),
+        Turn("Speaker 2", 4.0, 5.0, "Hi"),
+    ]
+
+
+def test_txt_prefixes_and_headers():
+    txt = (
+        "[00:00:05] Dr. Jane van Doe: Welcome everyone\n"
+        "The plan is: ship it\n"
+        "Bob Smith  0:42\n"
+        "Thanks Jane\n"
+    )
+    assert parse(txt, "call.txt") == [
+        Turn("Dr. Jane van Doe", 5.0, 42.0, "Welcome everyone The plan is: ship it"),
+        Turn("Bob Smith", 42.0, None, "Thanks Jane"),
+    ]
+
+
+def test_docx_paragraphs():
+    docx = make_docx(["Alice: We sell to the ER", "Step 1: call them", "Bob: Makes sense"])
+    assert parse_transcript(docx, "call.docx") == [
+        Turn("Alice", None, None, "We sell to the ER Step 1: call them"),
+        Turn("Bob", None, None, "Makes sense"),
+    ]
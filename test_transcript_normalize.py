@@ -0,0 +1,30 @@
+"""
+Transcript Normalization Tests
+"""
+
+from transcript_normalize import normalize_transcript
+
+
+def test_times_in_sentences_are_kept():
+    text, _ = normalize_transcript("Alice: We close every Friday at 5:30 and the deadline is 10:00 tomorrow.")
+    assert text == "Alice: We close every Friday at 5:30 and the deadline is 10:00 tomorrow."
+
+
+def test_noise_tag_with_timestamp_is_removed_whole():
+    text, _ = normalize_transcript("Alice: So [inaudible 00:01:02] ok we grew [00:03:04] a lot.")
+    assert text == "Alice: So ok we grew a lot."
+
+
+def test_transcript_timestamps_are_stripped():
+    text, _ = normalize_transcript("[00:00:12] Bob: We open at 9:00\n00:00:15.000 --> 00:00:18.000\nBob: every day")
+    assert text == "Bob: We open at 9:00 every day"
+
+
+def test_time_at_start_of_utterance_is_kept():
+    text, _ = normalize_transcript("Alice: 5:30 is when we close.\n[00:01:00] Bob: 9:00 works for me.")
+    assert text == "Alice: 5:30 is when we close.\nBob: 9:00 works for me."
+
+
+def test_fillers_match_lowercase_only():
+    text, _ = normalize_transcript("Alice: Um, we sell to the ER and, uh, the AH unit.")
+    assert text == "Alice: we sell to the ER and the AH unit."
@@ -0,0 +1,288 @@
+"""
+Transcript File Ingestion Module
+Stream-parses VTT, SRT, plain text and DOCX transcripts into a compact turn list
+"""
+
+import hashlib
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Turn(NamedTuple):
+    speaker: str
+    start: Optional[float]
+    end: Optional[float]
+    text: str
+
+
+SUPPORTED_EXTENSIONS = ["vtt", "srt", "txt", "docx"]
+
+_CHUNK_SIZE = 1 << 16
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_TS = r"(?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?"
+_CUE_TIMING_RE = re.compile(rf"^\s*({_TS})\s*-->\s*({_TS})")
+_VOICE_RE = re.compile(r"^<v(?:\.[^\s>]*)?\s+([^>]+)>")
+_TAG_RE = re.compile(r"</?[^>]+>")
+# Speaker labels are at most four capitalized words, numbers or name particles,
+# e.g. "Speaker 1" or "Dr. Jane van Doe". Numbered headings ("Step 1") and
+# sentences ("The plan is: ...") are not labels.
+_PARTICLES = r"(?:van|von|de|der|den|da|di|del|du|la|le|bin|al)(?![\w'&.-])"
+_HEADINGS = r"(?:Step|Part|Section|Chapter|Item|Phase|Point|Option|Slide|Page|Day|Week|Round)\s+\d"
+_NAME = rf"(?!{_HEADINGS})[A-Z][\w'&.-]*(?: (?:[A-Z0-9][\w'&.-]*|&|{_PARTICLES})){{0,3}}"
+_SPEAKER_PREFIX_RE = re.compile(
+    rf"^(?:\[?({_TS})\]?\s*)?({_NAME})\s*(?:\[?({_TS})\]?)?\s*:\s+(.*)$"
+)
+_SPEAKER_HEADER_RE = re.compile(rf"^({_NAME})\s+\(?({_TS})\)?$")
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Convert "HH:MM:SS.mmm", "MM:SS,mmm" or "H:MM:SS" into seconds
+    """
+    seconds = 0.0
+    for part in value.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Format seconds as HH:MM:SS
+    """
+    total = int(seconds)
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def hash_upload(fileobj: BinaryIO) -> str:
+    """
+    Compute a SHA-256 content hash in chunks and rewind the file
+    """
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """
+    SHA-256 content hash of pasted transcript text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _iter_lines(fileobj: BinaryIO) -> Iterator[str]:
+    """
+    Decode a binary file line by line without reading it all into memory
+    """
+    first = True
+    for raw in fileobj:
+        line = raw.decode("utf-8", errors="replace")
+        if first:
+            line = line.lstrip("\ufeff")
+            first = False
+        yield line.rstrip("\r\n")
+
+
+def _merge(turns: Iterable[Turn]) -> Iterator[Turn]:
+    """
+    Merge consecutive fragments from the same speaker into a single turn
+
+    Fragment texts are collected and joined once per turn, keeping this linear.
+    """
+    current = None
+    parts = []
+    for turn in turns:
+        if not turn.text:
+            continue
+        if current is not None and current.speaker == turn.speaker:
+            if current.start is None:
+                current = current._replace(start=turn.start)
+            if turn.end is not None:
+                current = current._replace(end=turn.end)
+            parts.append(turn.text)
+            continue
+        if current is not None:
+            yield current._replace(text=" ".join(parts))
+        current = turn
+        parts = [turn.text]
+    if current is not None:
+        yield current._replace(text=" ".join(parts))
+
+
+def _split_speaker(text: str, allow_prefix: bool = True) -> Tuple[Optional[str], str]:
+    """
+    Split a "<v Name>" voice tag or, if allowed, a "Name: text" prefix off a cue line
+    """
+    voice = _VOICE_RE.match(text)
+    if voice:
+        return voice.group(1).strip(), _TAG_RE.sub("", text[voice.end():]).strip()
+
+    text = _TAG_RE.sub("", text).strip()
+    prefix = _SPEAKER_PREFIX_RE.match(text) if allow_prefix else None
+    if prefix:
+        return prefix.group(2).strip(), prefix.group(4).strip()
+    return None, text
+
+
+def _iter_cues(lines: Iterable[str]) -> Iterator[Turn]:
+    """
+    Parse VTT/SRT cue blocks into per-cue turns
+
+    "<v Name>" voice tags are preferred. Once a file uses them, "Name: text"
+    prefixes are treated as cue text; otherwise a prefix is only a label on
+    the first text line of a cue.
+    """
+    speaker = "Unknown"
+    start = end = None
+    parts = []
+    first_line = False
+    voice_tags = False
+
+    def flush():
+        if start is None or not parts:
+            return None
+        return Turn(speaker, start, end, " ".join(parts))
+
+    for line in lines:
+        line = line.strip()
+        timing = _CUE_TIMING_RE.match(line)
+        if timing:
+            cue = flush()
+            if cue:
+                yield cue
+            start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+            parts = []
+            first_line = True
+            continue
+        if not line:
+            cue = flush()
+            if cue:
+                yield cue
+            start = end = None
+            parts = []
+            continue
+        if start is None:
+            # Header, NOTE, STYLE or cue identifier lines
+            continue
+        voice_tags = voice_tags or bool(_VOICE_RE.match(line))
+        name, text = _split_speaker(line, allow_prefix=first_line and not voice_tags)
+        first_line = False
+        if name and name != speaker:
+            cue = flush()
+            if cue:
+                yield cue
+            speaker = name
+            parts = []
+        if text:
+            parts.append(text)
+
+    cue = flush()
+    if cue:
+        yield cue
+
+
+def _iter_text_turns(lines: Iterable[str]) -> Iterator[Turn]:
+    """
+    Parse "Speaker: text", "[00:01:02] Speaker: text" and "Speaker  0:03" header lines
+    """
+    speaker = None
+    start = None
+    parts = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        header = _SPEAKER_HEADER_RE.match(line)
+        prefix = None if header else _SPEAKER_PREFIX_RE.match(line)
+
+        if header or prefix:
+            if header:
+                name, ts, text = header.group(1), header.group(2), ""
+            else:
+                name, ts, text = prefix.group(2), prefix.group(1) or prefix.group(3), prefix.group(4)
+            next_start = parse_timestamp(ts) if ts else None
+            if parts:
+                yield Turn(speaker or "Unknown", start, next_start, " ".join(parts))
+            speaker, start, parts = name.strip(), next_start, []
+            if text.strip():
+                parts.append(text.strip())
+        else:
+            parts.append(line)
+
+    if parts:
+        yield Turn(speaker or "Unknown", start, None, " ".join(parts))
+
+
+def _iter_docx_paragraphs(fileobj: BinaryIO) -> Iterator[str]:
+    """
+    Stream paragraph text out of word/document.xml without building the full tree
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        with archive.open("word/document.xml") as document:
+            parts = []
+            for event, elem in ET.iterparse(document, events=("end",)):
+                if elem.tag == f"{_WORD_NS}t":
+                    parts.append(elem.text or "")
+                elif elem.tag == f"{_WORD_NS}tab":
+                    parts.append(" ")
+                elif elem.tag == f"{_WORD_NS}p":
+                    yield "".join(parts)
+                    parts = []
+                    elem.clear()
+
+
+def parse_transcript(fileobj: BinaryIO, filename: str) -> List[Turn]:
+    """
+    Parse an uploaded transcript into a list of turns
+
+    Args:
+        fileobj: Binary file-like object (e.g. a Streamlit UploadedFile)
+        filename: Original file name, used to pick the parser
+
+    Returns:
+        List of Turn(speaker, start, end, text) with consecutive fragments
+        from the same speaker merged
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else "txt"
+    fileobj.seek(0)
+
+    if extension in ("vtt", "srt"):
+        turns = _iter_cues(_iter_lines(fileobj))
+    elif extension == "docx":
+        turns = _iter_text_turns(_iter_docx_paragraphs(fileobj))
+    elif extension == "txt":
+        turns = _iter_text_turns(_iter_lines(fileobj))
+    else:
+        raise ValueError(f"Unsupported transcript format: .{extension}")
+
+    result = list(_merge(turns))
+    fileobj.seek(0)
+    return result
+
+
+def parse_text_turns(text: str, merge: bool = True) -> List[Turn]:
+    """
+    Parse pasted transcript text into turns using the plain-text speaker formats
+    """
+    turns = _iter_text_turns(text.splitlines())
+    return list(_merge(turns) if merge else turns)
+
+
+def render_turns(turns: Iterable[Turn]) -> str:
+    """
+    Render a turn list back into the plain-text transcript used in prompts
+    """
+    lines = []
+    for turn in turns:
+        if turn.start is not None:
+            lines.append(f"[{format_timestamp(turn.start)}] {turn.speaker}: {turn.text}")
+        else:
+            lines.append(f"{turn.speaker}: {turn.text}")
+    return "\n".join(lines)
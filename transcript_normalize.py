@@ -0,0 +1,116 @@
+"""
+Transcript Normalization Module
+Local, linear-time cleanup of transcripts before they are sent to Gemini
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from transcript_ingest import parse_text_turns, render_turns
+
+DEFAULT_FILLERS = ("um", "umm", "uh", "uhh", "uh-huh", "er", "erm", "ah", "hmm", "mhm", "mm-hmm")
+
+# Filler phrases are only removed when set off by commas ("So, you know, we...")
+FILLER_PHRASES = ("you know", "i mean")
+
+
+class NormalizeOptions(NamedTuple):
+    strip_timestamps: bool = True
+    remove_fillers: bool = True
+    remove_noise: bool = True
+    merge_turns: bool = True
+    collapse_whitespace: bool = True
+    fillers: Tuple[str, ...] = DEFAULT_FILLERS
+
+
+_CLOCK = r"(?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?"
+
+# Only transcript markup is stripped: bracketed times and cue ranges. Times
+# leading a speaker line are already parsed into Turn.start, and times inside
+# an utterance ("5:30 is when we close") are content.
+_TIMESTAMP_RE = re.compile(rf"[\[(]{_CLOCK}[\])]|{_CLOCK}\s*-->\s*{_CLOCK}")
+_NOISE_RE = re.compile(
+    r"[\[(](?:inaudible|crosstalk|laughter|laughs|laughing|music|noise|silence|"
+    r"unintelligible|background noise|applause|coughs?|pause)[^\])]{0,40}[\])]",
+    re.IGNORECASE,
+)
+_PHRASE_RE = re.compile(
+    r"(?:(?<=,)|^|(?<=[.!?]))\s*(?:" + "|".join(FILLER_PHRASES) + r"),(?=\s)",
+    re.IGNORECASE,
+)
+_SPACE_RE = re.compile(r"[ \t]+")
+_ORPHAN_PUNCT_RE = re.compile(r"\s+([,.!?;:])")
+_DOUBLE_COMMA_RE = re.compile(r",(?:\s*,)+")
+_LEADING_COMMA_RE = re.compile(r"^[\s,]+")
+
+
+@lru_cache(maxsize=8)
+def _filler_re(fillers: Tuple[str, ...]) -> re.Pattern:
+    # Case-sensitive: "um" or a sentence-initial "Um" is a filler, "ER" is not
+    words = "|".join(
+        f"[{re.escape(word[0])}{re.escape(word[0].upper())}]{re.escape(word[1:])}"
+        for word in sorted({word.lower() for word in fillers}, key=len, reverse=True)
+    )
+    return re.compile(rf",?\s*(?<![\w'-])(?:{words})(?![\w'-])[,.]?")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough Gemini token count (about four characters per token)
+    """
+    return (len(text) + 3) // 4
+
+
+def _clean_text(text: str, options: NormalizeOptions) -> str:
+    # Noise tags first, so a tag like "[inaudible 00:01:02]" is removed whole
+    if options.remove_noise:
+        text = _NOISE_RE.sub(" ", text)
+    if options.strip_timestamps:
+        text = _TIMESTAMP_RE.sub(" ", text)
+    if options.remove_fillers:
+        text = _PHRASE_RE.sub("", text)
+        text = _filler_re(options.fillers).sub(" ", text)
+    if options.collapse_whitespace:
+        text = _SPACE_RE.sub(" ", text)
+        text = _ORPHAN_PUNCT_RE.sub(r"\1", text)
+        text = _DOUBLE_COMMA_RE.sub(",", text)
+        text = _LEADING_COMMA_RE.sub("", text).strip()
+    return text
+
+
+def normalize_transcript(text: str, options: NormalizeOptions = NormalizeOptions()) -> Tuple[str, Dict[str, int]]:
+    """
+    Clean a transcript without an LLM call
+
+    Parses speaker turns, optionally merges consecutive turns from the same
+    speaker, and strips timestamps, noise tags and filler words. Every step is
+    a single regex pass over the text, so cost stays linear in its length.
+
+    Returns:
+        Tuple of (normalized text, stats with before/after characters and tokens)
+    """
+    turns = parse_text_turns(text, merge=options.merge_turns)
+    cleaned = []
+    for turn in turns:
+        turn_text = _clean_text(turn.text, options)
+        if turn_text:
+            cleaned.append(turn._replace(text=turn_text))
+
+    if options.strip_timestamps:
+        cleaned = [turn._replace(start=None, end=None) for turn in cleaned]
+
+    # Text without any recognizable speaker labels is passed through as prose
+    if all(turn.speaker == "Unknown" for turn in cleaned):
+        result = "\n".join(turn.text for turn in cleaned)
+    else:
+        result = render_turns(cleaned)
+
+    stats = {
+        "turns": len(cleaned),
+        "chars_before": len(text),
+        "chars_after": len(result),
+        "tokens_before": estimate_tokens(text),
+        "tokens_after": estimate_tokens(result),
+    }
+    return result, stats
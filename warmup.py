@@ -0,0 +1,123 @@
+"""
+Connection Warm-up Module
+Concurrently primes Gemini, GHL and Google connections once per process and caches their health
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from cassette import MODE_REPLAY, get_cassette
+from generation import MODEL, get_client
+from ghl_integration import GoHighLevelClient
+from google_docs_integration import warm_up_google
+from quota_scheduler import PRIORITY_BATCH, get_scheduler
+
+WARMUP_TTL_SECONDS = 10 * 60
+
+SERVICES = ["gemini", "ghl", "google"]
+
+# credentials fingerprint -> {"started": float, "results": {service: result}}
+_health = {}
+_health_lock = threading.Lock()
+
+
+def _probe(check: Callable[[], Optional[str]]) -> Dict:
+    """
+    Time one warm-up check; a returned string is treated as a failure message
+    """
+    started = time.perf_counter()
+    try:
+        error = check()
+    except Exception as e:
+        error = str(e)
+    return {
+        "ok": error is None,
+        "latency_ms": round((time.perf_counter() - started) * 1000),
+        "message": error or "",
+        "checked_at": time.time(),
+    }
+
+
+def _check_gemini(api_key: str) -> Optional[str]:
+    if not api_key:
+        return "No API key configured"
+    # Creates the shared client and opens its TLS connection, within the shared quota
+    get_scheduler().acquire("gemini", "warmup", PRIORITY_BATCH)
+    get_client(api_key).models.get(model=MODEL)
+    return None
+
+
+def _check_ghl(api_key: str, location_id: str) -> Optional[str]:
+    if not api_key or not location_id:
+        return "No API key or location configured"
+    # Opens the connection and primes the process-wide custom field cache used by every fetch
+    if not GoHighLevelClient(api_key, location_id).get_custom_fields_map():
+        return "Could not load custom field definitions"
+    return None
+
+
+def _check_google() -> Optional[str]:
+    warm_up_google()
+    return None
+
+
+def _key(gemini_api_key: str, ghl_api_key: str, ghl_location_id: str) -> str:
+    raw = "\0".join([gemini_api_key or "", ghl_api_key or "", ghl_location_id or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _replaying() -> Optional[str]:
+    return "Replaying recorded calls" if get_cassette() and get_cassette().mode == MODE_REPLAY else None
+
+
+def _run(key: str, gemini_api_key: str, ghl_api_key: str, ghl_location_id: str):
+    # Replays must not touch the network, so every probe reports the replay instead
+    if _replaying():
+        result = {"ok": True, "latency_ms": 0, "message": _replaying(), "checked_at": time.time()}
+        with _health_lock:
+            _health[key]["results"] = {name: dict(result) for name in SERVICES}
+        return
+
+    checks = {
+        "gemini": lambda: _check_gemini(gemini_api_key),
+        "ghl": lambda: _check_ghl(ghl_api_key, ghl_location_id),
+        "google": _check_google,
+    }
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = {name: pool.submit(_probe, check) for name, check in checks.items()}
+        for name, future in futures.items():
+            result = future.result()
+            with _health_lock:
+                _health[key]["results"][name] = result
+
+
+def start_warm_up(gemini_api_key: str, ghl_api_key: str, ghl_location_id: str, force: bool = False) -> str:
+    """
+    Start warming up all services in the background unless a fresh result exists
+
+    Returns:
+        Key for looking up the results with get_health()
+    """
+    key = _key(gemini_api_key, ghl_api_key, ghl_location_id)
+    with _health_lock:
+        entry = _health.get(key)
+        if entry and not force and time.time() - entry["started"] < WARMUP_TTL_SECONDS:
+            return key
+        _health[key] = {"started": time.time(), "results": {}}
+
+    threading.Thread(
+        target=_run, args=(key, gemini_api_key, ghl_api_key, ghl_location_id), daemon=True
+    ).start()
+    return key
+
+
+def get_health(key: str) -> Dict[str, Optional[Dict]]:
+    """
+    Latest warm-up result per service (None while still running)
+    """
+    with _health_lock:
+        results = dict(_health.get(key, {}).get("results", {}))
+    return {name: results.get(name) for name in SERVICES}